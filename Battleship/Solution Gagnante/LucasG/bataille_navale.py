@@ -1,15 +1,63 @@
 
 import random
 import os
+import sys
 import time
+from array import array
+
+from fin_de_partie import EndgameStrategy
+from instrumentation import TurnProfiler
+from regles import rule_set
+from rendu import FrameRenderer
+from strategies import HumanStrategy, RandomStrategy
+
+# Flotte standard, partagée par tous les joueurs: elle ne doit pas être modifiée.
+FLEET = (
+    ("Porte-avions", 5),
+    ("Cuirassé", 4),
+    ("Croiseur", 3),
+    ("Sous-marin", 3),
+    ("Destroyer", 2)
+)
+
+
+def column_label(index):
+    """Libellé de colonne façon tableur: A..Z, AA..AZ, BA..."""
+    label = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+def position_label(position):
+    x, y = position
+    return f"{column_label(x)}{y + 1}"
+
+
+def parse_position(text):
+    """Convertit 'A1', 'AB12'... en (colonne, ligne) à partir de 0."""
+    letters = text.rstrip('0123456789')
+    digits = text[len(letters):]
+    if not letters or not digits or not letters.isalpha() or not letters.isascii():
+        raise ValueError(f"Position invalide: {text}")
+    col = 0
+    for letter in letters:
+        col = col * 26 + ord(letter) - ord('A') + 1
+    return col - 1, int(digits) - 1
+
 
 class Ship:
     
+    __slots__ = ("name", "size", "positions", "hits")
+    
     def __init__(self, name, size):
         self.name = name
         self.size = size
-        self.positions = [] 
-        self.hits = [] 
+        self.positions = ()
+        # Une touche par case du navire: bit i pour positions[i].
+        self.hits = 0
     
     def is_placed(self):
         return len(self.positions) > 0
@@ -18,154 +66,275 @@ class Ship:
         
         if len(positions) != self.size:
             raise ValueError(f"Le nombre de positions ({len(positions)}) ne correspond pas à la taille du navire ({self.size})")
-        self.positions = positions
+        self.positions = tuple(positions)
     
     def is_hit(self, position):
        
         if position in self.positions:
-            self.hits.append(position)
+            self.hits |= 1 << self.positions.index(position)
             return True
         return False
     
     def is_sunk(self):
-        return len(self.hits) == self.size
+        return self.hits == (1 << self.size) - 1
+
+
+# États d'une case de Board.cells: les caractères affichés par display.
+WATER, SHIP, HIT, MISS = b"~OX-"
+
+
+def _cell_array(size, values=()):
+    """Tableau compact d'indices de case (y * size + x)."""
+    return array("H" if size * size <= 1 << 16 else "I", values)
+
+
+class FreeCells:
+    """Cases jamais visées d'une grille, pour en tirer une au hasard en temps constant.
+
+    Une case retirée est remplacée dans `cells` par la dernière de la liste;
+    `index` donne la place de chaque case dans `cells`.
+    """
+
+    __slots__ = ("size", "cells", "index")
+
+    def __init__(self, size, cells):
+        self.size = size
+        self.cells = _cell_array(size, cells)
+        self.index = _cell_array(size, [0]) * (size * size)
+        for i, cell in enumerate(self.cells):
+            self.index[cell] = i
+
+    def remove(self, cell):
+        i = self.index[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+
+    def choice(self, rng):
+        """Position (x, y) d'une case tirée au hasard par `rng`."""
+        y, x = divmod(rng.choice(self.cells), self.size)
+        return x, y
 
 
 class Board:
+    """Grille d'un joueur, ou vue de la grille adverse.
+
+    L'état des cases tient dans un bytearray (un octet par case, le caractère
+    affiché) et ship_index donne, pour chaque case, 1 + l'indice de son navire
+    dans ships (0 sans navire). Les cases jamais visées, pour random_free_cell,
+    ne sont construites qu'au premier tirage. Les placements suivent `rules`
+    (voir regles.py), de même taille que la grille.
+    """
     
-    def __init__(self, size=10):
+    __slots__ = ("size", "rng", "rules", "cells", "ship_index", "ships", "ships_afloat",
+                 "forbidden", "free")
+    
+    def __init__(self, size=10, rng=None, rules=None):
         self.size = size
-        self.grid = [['~' for _ in range(size)] for _ in range(size)]
+        # Générateur des tirages de la grille; le module random par défaut.
+        self.rng = rng or random
+        self.rules = rules or rule_set(size)
+        self.cells = bytearray(b"~") * (size * size)
+        self.ship_index = bytearray(size * size)
         self.ships = []
-        self.shots = []  
+        self.ships_afloat = 0
+        self.forbidden = 0
+        # Cases jamais visées: retrait par échange avec la dernière, en O(1).
+        self.free = None
+    
+    @property
+    def shots(self):
+        """Ensemble des positions déjà visées."""
+        size = self.size
+        return {(i % size, i // size) for i, cell in enumerate(self.cells)
+                if cell == HIT or cell == MISS}
+    
+    def is_shot(self, position):
+        x, y = position
+        cell = self.cells[y * self.size + x]
+        return cell == HIT or cell == MISS
     
     def add_ship(self, ship):
 
         self.ships.append(ship)
+        self.ships_afloat += 1
+        if len(self.ships) == 256:
+            self.ship_index = array("H", self.ship_index)
+        placement = self.rules.table(ship.size).find(ship.positions)
+        if placement is not None:
+            self.forbidden |= placement.halo
+        else:
+            halos = self.rules.halos()
+            for x, y in ship.positions:
+                self.forbidden |= halos[y * self.size + x]
         for x, y in ship.positions:
-            self.grid[y][x] = 'O'
+            cell = y * self.size + x
+            self.cells[cell] = SHIP
+            self.ship_index[cell] = len(self.ships)
     
     def can_place_ship(self, positions):
-        for x, y in positions:
-            if x < 0 or x >= self.size or y < 0 or y >= self.size:
-                return False
-        
-      
-        for x, y in positions:
-            if self.grid[y][x] != '~':
-                return False
-            
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < self.size and 0 <= ny < self.size and (nx, ny) not in positions:
-                        if self.grid[ny][nx] == 'O':
-                            return False
-        
-        return True
+        # Une position hors de la table (hors grille ou non alignée) est refusée;
+        # forbidden couvre les navires déjà placés et leurs cases voisines.
+        placement = self.rules.table(len(positions)).find(positions)
+        return placement is not None and not placement.mask & self.forbidden
     
     def place_ship_randomly(self, ship):
-        max_attempts = 100
-        for _ in range(max_attempts):
-            orientation = random.randint(0, 1)
-            
-            if orientation == 0:  
-                x = random.randint(0, self.size - ship.size)
-                y = random.randint(0, self.size - 1)
-                positions = [(x + i, y) for i in range(ship.size)]
-            else:  
-                x = random.randint(0, self.size - 1)
-                y = random.randint(0, self.size - ship.size)
-                positions = [(x, y + i) for i in range(ship.size)]
-            
-            if self.can_place_ship(positions):
-                ship.place(positions)
-                self.add_ship(ship)
-                return True
+        placement = self.rules.table(ship.size).random_placement(self.forbidden, self.rng)
+        if placement is None:
+            return False
         
-        return False
+        ship.place(placement.positions)
+        self.add_ship(ship)
+        return True
     
     def place_all_ships_randomly(self, ships):
 
-        for ship in ships:
-            if not self.place_ship_randomly(ship):
+        # Sur une grille vide, la flotte est tirée d'un bloc et uniformément.
+        if not self.ships:
+            placements = self.rules.sampler(ship.size for ship in ships).sample(self.rng)
+            if placements is None:
                 return False
+        else:
+            placements = []
+            forbidden = self.forbidden
+            for ship in ships:
+                placement = self.rules.table(ship.size).random_placement(forbidden, self.rng)
+                if placement is None:
+                    return False
+                placements.append(placement)
+                forbidden |= placement.halo
+        
+        for ship, placement in zip(ships, placements):
+            ship.place(placement.positions)
+            self.add_ship(ship)
         return True
     
     def shoot(self, position):
    
         x, y = position
+        cell = y * self.size + x
         
       
-        if position in self.shots:
+        state = self.cells[cell]
+        if state == HIT or state == MISS:
             return None, None
         
-        self.shots.append(position)
-        
-
-        hit = False
-        ship_sunk = None
+        self.mark_shot(position)
         
-        for ship in self.ships:
-            if ship.is_hit(position):
-                hit = True
-                self.grid[y][x] = 'X'
-                if ship.is_sunk():
-                    ship_sunk = ship
-                break
+        index = self.ship_index[cell]
+        if not index:
+            self.cells[cell] = MISS
+            return False, None
         
-        if not hit:
-            self.grid[y][x] = '-'
-        
-        return hit, ship_sunk
+        ship = self.ships[index - 1]
+        ship.is_hit(position)
+        self.cells[cell] = HIT
+        if ship.is_sunk():
+            self.ships_afloat -= 1
+            return True, ship
+        return True, None
+    
+    def mark_shot(self, position):
+        """Note un tir en `position` et la retire des cases libres."""
+        x, y = position
+        cell = y * self.size + x
+        state = self.cells[cell]
+        if state == HIT or state == MISS:
+            return
+        self.cells[cell] = MISS
+        if self.free is not None:
+            self.free.remove(cell)
+    
+    def random_free_cell(self):
+        """Case jamais visée tirée au hasard."""
+        if self.free is None:
+            self.free = FreeCells(self.size, (i for i, cell in enumerate(self.cells)
+                                              if cell != HIT and cell != MISS))
+        return self.free.choice(self.rng)
+    
+    def record_result(self, position, hit):
+        """Note sur la grille adverse le résultat d'un de nos tirs."""
+        x, y = position
+        self.mark_shot(position)
+        self.cells[y * self.size + x] = HIT if hit else MISS
     
     def all_ships_sunk(self):
 
-        return all(ship.is_sunk() for ship in self.ships)
+        return self.ships_afloat == 0
     
     def display(self, hide_ships=False):
 
-        display_grid = [row[:] for row in self.grid]
-
+        size = self.size
+        text = self.cells.decode("ascii")
         if hide_ships:
-            for y in range(self.size):
-                for x in range(self.size):
-                    if display_grid[y][x] == 'O':
-                        display_grid[y][x] = '~'
+            text = text.replace('O', '~')
         
-        header = '   ' + ' '.join(chr(65 + i) for i in range(self.size))
+        width = len(column_label(size - 1))
+        header = '   ' + ' '.join(column_label(i).ljust(width) for i in range(size))
 
-        rows = [header]
-        for i, row in enumerate(display_grid):
-            row_str = f'{i+1:2d} ' + ' '.join(row)
-            rows.append(row_str)
+        rows = [header.rstrip()]
+        for i in range(size):
+            row = text[i * size:(i + 1) * size]
+            row_str = f'{i+1:2d} ' + ' '.join(cell.ljust(width) for cell in row)
+            rows.append(row_str.rstrip())
         
         return '\n'.join(rows)
 
 
 class Player:
 
+    __slots__ = ("name", "is_computer", "size", "board_class", "fleet", "rules", "rng", "board",
+                 "opponent_board", "strategy")
     
-    def __init__(self, name, is_computer=False):
+    def __init__(self, name, is_computer=False, size=10, board_class=None, fleet=None,
+                 strategy=None, endgame=False, rng=None, rules=None):
 
+        # Les règles (regles.RuleSet), si elles sont données, fixent la taille et la flotte.
+        if rules is None:
+            rules = rule_set(size, tuple(map(tuple, fleet or FLEET)))
         self.name = name
         self.is_computer = is_computer
-        self.board = Board()
-        self.opponent_board = Board() 
+        self.size = size = rules.size
+        self.board_class = board_class or Board
+        self.fleet = rules.fleet
+        self.rules = rules
+        if not rules.feasible():
+            raise ValueError(f"La flotte ne tient pas sur une grille de {size} cases")
+        self.rng = rng or random
+        self.board = self.new_board()
+        self.opponent_board = self.new_board()
+        if strategy is None:
+            strategy = RandomStrategy() if is_computer else HumanStrategy(self)
+        # Avec endgame, l'ordinateur finit la partie avec le solveur exact de fin_de_partie.py,
+        # qui suppose que les navires ne se touchent pas; le tir au hasard reste
+        # au hasard jusqu'au bout.
+        if (is_computer and endgame and not rules.touching
+                and not isinstance(strategy, RandomStrategy)):
+            strategy = EndgameStrategy(strategy, size, self.fleet)
+        self.strategy = strategy
+        if rng is not None:
+            strategy.set_rng(rng)
+    
+    def set_rng(self, rng):
+        """Donne au joueur, à ses grilles et à sa stratégie le générateur `rng`.
+
+        Avec un random.Random propre à la partie, celle-ci ne dépend plus de
+        l'état global du module random et se rejoue à l'identique.
+        """
+        self.rng = rng
+        self.board.rng = rng
+        self.opponent_board.rng = rng
+        self.strategy.set_rng(rng)
+    
+    def new_board(self):
+        """Grille vide de la classe, des règles et du générateur du joueur."""
+        return self.board_class(self.size, rng=self.rng, rules=self.rules)
+    
     def setup_ships(self):
        
-        ships = [
-            Ship("Porte-avions", 5),
-            Ship("Cuirassé", 4),
-            Ship("Croiseur", 3),
-            Ship("Sous-marin", 3),
-            Ship("Destroyer", 2)
-        ]
-        
-        if self.is_computer:
-            self.board.place_all_ships_randomly(ships)
-        else:
-            self._manual_ship_placement(ships)
+        ships = [Ship(name, size) for name, size in self.fleet]
+        return self.strategy.place_fleet(self.board, ships)
     
     def _manual_ship_placement(self, ships):
       
@@ -184,8 +353,7 @@ class Player:
                         time.sleep(1)
                         continue
                     
-                    col = ord(position_input[0]) - ord('A')
-                    row = int(position_input[1:]) - 1
+                    col, row = parse_position(position_input)
                     
                     orientation_input = input("Orientation (H: horizontal, V: vertical): ").strip().upper()
                     if orientation_input not in ['H', 'V']:
@@ -212,10 +380,7 @@ class Player:
     
     def get_shot(self):
 
-        if self.is_computer:
-            return self._get_computer_shot()
-        else:
-            return self._get_human_shot()
+        return self.strategy.choose_shot(self.opponent_board)
     
     def _get_human_shot(self):
 
@@ -226,49 +391,39 @@ class Player:
                     print("Format invalide. Exemple: A1")
                     continue
                 
-                col = ord(position_input[0]) - ord('A')
-                row = int(position_input[1:]) - 1
+                col, row = parse_position(position_input)
                 
                 if 0 <= col < self.opponent_board.size and 0 <= row < self.opponent_board.size:
                     position = (col, row)
-                    if position in self.opponent_board.shots:
+                    if self.opponent_board.is_shot(position):
                         print("Vous avez déjà tiré à cette position.")
                         continue
                     return position
                 else:
-                    print(f"Position hors limites. Utilisez A-J et 1-10.")
+                    last = column_label(self.opponent_board.size - 1)
+                    print(f"Position hors limites. Utilisez A-{last} et 1-{self.opponent_board.size}.")
             
             except (ValueError, IndexError):
                 print("Position invalide. Exemple: A1")
     
-    def _get_computer_shot(self):
-
-        available_positions = []
-        for x in range(self.opponent_board.size):
-            for y in range(self.opponent_board.size):
-                position = (x, y)
-                if position not in self.opponent_board.shots:
-                    available_positions.append(position)
-        
-        return random.choice(available_positions)
-    
     def receive_shot_result(self, position, hit, ship_sunk):
 
-        x, y = position
-        self.opponent_board.shots.append(position)
-        
-        if hit:
-            self.opponent_board.grid[y][x] = 'X'
-        else:
-            self.opponent_board.grid[y][x] = '-'
+        self.opponent_board.record_result(position, hit)
+        self.strategy.observe_result(position, hit, ship_sunk)
 
 
 class Game:
  
-    def __init__(self):
-        self.human_player = Player("Joueur")
-        self.computer_player = Player("Ordinateur", is_computer=True)
+    def __init__(self, size=10, board_class=None, fleet=None, renderer=None, profiler=None,
+                 rules=None):
+        self.renderer = renderer or FrameRenderer()
+        self.profiler = profiler or TurnProfiler(enabled=False)
+        self.human_player = Player("Joueur", size=size, board_class=board_class, fleet=fleet,
+                                   rules=rules)
+        self.computer_player = Player("Ordinateur", is_computer=True, size=size,
+                                      board_class=board_class, fleet=fleet, rules=rules)
         self.current_player = self.human_player
+        self.history = []
     
     def setup(self):
     
@@ -279,53 +434,76 @@ class Game:
         
         input("Appuyez sur Entrée pour commencer...")
         
-        self.human_player.setup_ships()
-        self.computer_player.setup_ships()
+        for player in (self.human_player, self.computer_player):
+            if not player.setup_ships():
+                raise ValueError(f"La flotte de {player.name} ne tient pas sur la grille")
         
-        self.human_player.opponent_board = Board()
-        self.computer_player.opponent_board = Board()
+        for player in (self.human_player, self.computer_player):
+            player.opponent_board = player.new_board()
+    
+    def snapshot(self):
+        """Instantané binaire compact de la partie (voir sauvegarde.py)."""
+        from sauvegarde import snapshot_game
+        return snapshot_game(self)
+    
+    @staticmethod
+    def from_snapshot(data):
+        """Partie restaurée à partir d'un instantané."""
+        from sauvegarde import restore_game
+        return restore_game(data)
     
     def play(self):
         """Joue la partie."""
         self.setup()
         
-        game_over = False
-        while not game_over:
-            self._play_turn()
-            
-            if self.computer_player.board.all_ships_sunk():
-                self._display_game_state()
-                print("\n🎉 Félicitations! Vous avez gagné! 🎉")
-                game_over = True
-            elif self.human_player.board.all_ships_sunk():
-                self._display_game_state()
-                print("\n😢 L'ordinateur a gagné. 😢")
-                game_over = True
-            
-            if self.current_player == self.human_player:
-                self.current_player = self.computer_player
-            else:
-                self.current_player = self.human_player
+        message = None
+        # L'affichage se fait sur l'écran alternatif du terminal, rendu même si
+        # la partie est interrompue; la dernière image y est réaffichée.
+        try:
+            while message is None:
+                self._play_turn()
+                
+                if self.computer_player.board.all_ships_sunk():
+                    self._display_game_state()
+                    message = "🎉 Félicitations! Vous avez gagné! 🎉"
+                elif self.human_player.board.all_ships_sunk():
+                    self._display_game_state()
+                    message = "😢 L'ordinateur a gagné. 😢"
+                
+                if self.current_player == self.human_player:
+                    self.current_player = self.computer_player
+                else:
+                    self.current_player = self.human_player
+        finally:
+            self.renderer.close()
         
+        print(f"\n{message}")
         print("\nFin de la partie.")
+        if self.profiler.enabled:
+            print("\n" + self.profiler.report())
     
     def _play_turn(self):
-        if self.current_player == self.human_player:
-            self._human_turn()
-        else:
-            self._computer_turn()
+        with self.profiler.measure("tour"):
+            if self.current_player == self.human_player:
+                self._human_turn()
+            else:
+                self._computer_turn()
     
     def _human_turn(self):
-        self._display_game_state()
+        measure = self.profiler.measure
+        with measure("affichage"):
+            self._display_game_state()
         
         print(f"\nC'est à votre tour de jouer.")
-        position = self.human_player.get_shot()
+        with measure("saisie"):
+            position = self.human_player.get_shot()
         
-        hit, ship_sunk = self.computer_player.board.shoot(position)
-        self.human_player.receive_shot_result(position, hit, ship_sunk)
+        with measure("mise_a_jour"):
+            hit, ship_sunk = self.computer_player.board.shoot(position)
+            self.human_player.receive_shot_result(position, hit, ship_sunk)
+            self.history.append(position)
         
-        x, y = position
-        position_str = f"{chr(65 + x)}{y + 1}"
+        position_str = position_label(position)
         
         if hit:
             print(f"\nTouché en {position_str}!")
@@ -334,19 +512,24 @@ class Game:
         else:
             print(f"\nÀ l'eau en {position_str}.")
         
-        input("\nAppuyez sur Entrée pour continuer...")
+        with measure("saisie"):
+            input("\nAppuyez sur Entrée pour continuer...")
     
     def _computer_turn(self):
+        measure = self.profiler.measure
         print("\nC'est au tour de l'ordinateur...")
-        time.sleep(1)
+        with measure("pause"):
+            time.sleep(1)
         
-        position = self.computer_player.get_shot()
+        with measure("decision"):
+            position = self.computer_player.get_shot()
         
-        hit, ship_sunk = self.human_player.board.shoot(position)
-        self.computer_player.receive_shot_result(position, hit, ship_sunk)
+        with measure("mise_a_jour"):
+            hit, ship_sunk = self.human_player.board.shoot(position)
+            self.computer_player.receive_shot_result(position, hit, ship_sunk)
+            self.history.append(position)
         
-        x, y = position
-        position_str = f"{chr(65 + x)}{y + 1}"
+        position_str = position_label(position)
         
         if hit:
             print(f"L'ordinateur a touché en {position_str}!")
@@ -355,24 +538,24 @@ class Game:
         else:
             print(f"L'ordinateur a tiré à l'eau en {position_str}.")
         
-        input("\nAppuyez sur Entrée pour continuer...")
+        with measure("saisie"):
+            input("\nAppuyez sur Entrée pour continuer...")
     
     def _display_game_state(self):
-        """Affiche l'état du jeu."""
-        clear_screen()
-        
-        print("=== BATAILLE NAVALE ===\n")
+        """Affiche l'état du jeu; seules les cases modifiées sont redessinées."""
+        lines = ["=== BATAILLE NAVALE ===", ""]
         
-        print("Grille de l'ordinateur:")
-        print(self.computer_player.board.display(hide_ships=True))
+        lines.append("Grille de l'ordinateur:")
+        lines.extend(self.computer_player.board.display(hide_ships=True).split('\n'))
         
-        print("\nVotre grille:")
-        print(self.human_player.board.display())
+        lines.extend(["", "Votre grille:"])
+        lines.extend(self.human_player.board.display().split('\n'))
         
         human_ships_remaining = sum(1 for ship in self.human_player.board.ships if not ship.is_sunk())
         computer_ships_remaining = sum(1 for ship in self.computer_player.board.ships if not ship.is_sunk())
         
-        print(f"\nNavires restants - Vous: {human_ships_remaining}, Ordinateur: {computer_ships_remaining}")
+        lines.extend(["", f"Navires restants - Vous: {human_ships_remaining}, Ordinateur: {computer_ships_remaining}"])
+        self.renderer.draw(lines)
 
 
 def clear_screen():
@@ -381,5 +564,8 @@ def clear_screen():
 
 
 if __name__ == "__main__":
-    game = Game()
+    # --profil affiche en fin de partie le temps passé dans chaque phase des tours;
+    # --contact autorise les navires à se toucher.
+    game = Game(profiler=TurnProfiler(enabled="--profil" in sys.argv),
+                rules=rule_set(10, FLEET, touching="--contact" in sys.argv))
     game.play()
@@ -0,0 +1,160 @@
+
+import argparse
+import json
+import platform
+import random
+import time
+
+from bataille_navale import FLEET, Board, Player, Ship
+from grand_plateau import large_fleet
+from placements import placement_table
+from simulation import simulate_game
+
+# (nom, taille de grille, flotte)
+CONFIGS = [
+    ("10x10-standard", 10, FLEET),
+    ("20x20-double", 20, large_fleet(2)),
+    ("32x32-quadruple", 32, large_fleet(4)),
+]
+
+
+def _fleet_board(size, fleet):
+    board = Board(size)
+    board.place_all_ships_randomly([Ship(name, length) for name, length in fleet])
+    return board
+
+
+def bench_can_place_ship(size, fleet, n_ops):
+    board = _fleet_board(size, fleet)
+    candidates = []
+    for _, length in fleet:
+        table = placement_table(size, length)
+        candidates.extend(list(placement.positions) for placement in table.placements)
+    latencies = []
+    for _ in range(n_ops):
+        positions = random.choice(candidates)
+        start = time.perf_counter_ns()
+        board.can_place_ship(positions)
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def bench_place_all_ships(size, fleet, n_ops):
+    latencies = []
+    for _ in range(n_ops):
+        ships = [Ship(name, length) for name, length in fleet]
+        board = Board(size)
+        start = time.perf_counter_ns()
+        board.place_all_ships_randomly(ships)
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def bench_shoot(size, fleet, n_ops):
+    latencies = []
+    while len(latencies) < n_ops:
+        board = _fleet_board(size, fleet)
+        cells = [(x, y) for y in range(size) for x in range(size)]
+        random.shuffle(cells)
+        for position in cells[:n_ops - len(latencies)]:
+            start = time.perf_counter_ns()
+            board.shoot(position)
+            latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def bench_computer_shot(size, fleet, n_ops):
+    # Tir de l'ordinateur par défaut (RandomStrategy), sans le coût de la mise à jour.
+    latencies = []
+    while len(latencies) < n_ops:
+        player = Player("Banc", is_computer=True, size=size, fleet=fleet)
+        for _ in range(min(size * size, n_ops - len(latencies))):
+            start = time.perf_counter_ns()
+            position = player.get_shot()
+            latencies.append(time.perf_counter_ns() - start)
+            player.receive_shot_result(position, False, None)
+    return latencies
+
+
+def bench_headless_game(size, fleet, n_ops):
+    latencies = []
+    for _ in range(n_ops):
+        first = Player("Ordinateur 1", is_computer=True, size=size, fleet=fleet)
+        second = Player("Ordinateur 2", is_computer=True, size=size, fleet=fleet)
+        start = time.perf_counter_ns()
+        simulate_game(first, second)
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+# (nom, fonction, nombre d'opérations pour --scale 1)
+BENCHMARKS = [
+    ("can_place_ship", bench_can_place_ship, 20000),
+    ("place_all_ships_randomly", bench_place_all_ships, 2000),
+    ("shoot", bench_shoot, 20000),
+    ("_get_computer_shot", bench_computer_shot, 20000),
+    ("partie_headless", bench_headless_game, 100),
+]
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+
+    def pick(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "ops": len(ordered),
+        "ops_per_sec": len(ordered) / (sum(ordered) / 1e9) if sum(ordered) else 0.0,
+        "p50_ns": pick(0.50),
+        "p90_ns": pick(0.90),
+        "p99_ns": pick(0.99),
+        "max_ns": ordered[-1],
+    }
+
+
+def run(scale=1.0, only=None, seed=0):
+    random.seed(seed)
+    results = []
+    for config, size, fleet in CONFIGS:
+        for name, function, n_ops in BENCHMARKS:
+            if only and name not in only:
+                continue
+            latencies = function(size, fleet, max(int(n_ops * scale), 1))
+            results.append(dict(benchmark=name, config=config, **summarize(latencies)))
+    return results
+
+
+def _print_table(results, baseline=None):
+    reference = {(r["benchmark"], r["config"]): r for r in baseline or []}
+    print(f"{'banc':<26} {'configuration':<17} {'ops/s':>12} {'p50':>10} {'p99':>10}")
+    for result in results:
+        line = (f"{result['benchmark']:<26} {result['config']:<17} {result['ops_per_sec']:>12,.0f} "
+                f"{result['p50_ns'] / 1000:>8.1f}us {result['p99_ns'] / 1000:>8.1f}us")
+        old = reference.get((result["benchmark"], result["config"]))
+        if old and old["ops_per_sec"]:
+            line += f"  x{result['ops_per_sec'] / old['ops_per_sec']:.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bancs d'essai du moteur de bataille navale.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplie le nombre d'opérations")
+    parser.add_argument("--only", nargs="*", choices=[name for name, _, _ in BENCHMARKS])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="enregistre les résultats dans ce fichier")
+    parser.add_argument("--compare", help="résultats JSON d'une exécution précédente")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.only, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    _print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": args.seed,
+                       "results": results}, file, indent=2)
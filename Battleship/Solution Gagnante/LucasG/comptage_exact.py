@@ -0,0 +1,450 @@
+
+import random
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from bataille_navale import FLEET, Player
+from fin_de_partie import enumerate_layouts
+from flotte import fleet_sampler
+from placements import neighbour_masks, placement_table
+from strategies import Observations, Strategy
+
+
+class _TooMuchWork(Exception):
+    pass
+
+
+class PlacementCounter:
+    """Compte exactement les flottes compatibles avec des observations.
+
+    `empty` est le masque des cases sûrement vides (tirs à l'eau, navires coulés
+    et leurs voisines), `full` celui des touches qu'aucun navire coulé
+    n'explique encore; `lengths` les longueurs des navires encore à flot. Un
+    navire à flot ne peut pas reposer tout entier sur des touches: il aurait été
+    annoncé coulé. Deux navires de même longueur ne sont pas distingués: les
+    proportions, donc les probabilités par case, n'en dépendent pas.
+
+    La grille est remplie case par case, ligne après ligne. Le profil qui sépare
+    les cases remplies des autres donne un code par colonne: pour les cases déjà
+    remplies de la ligne, vide, occupée, ou traversée par un navire vertical
+    auquel il reste r cases; pour les suivantes, libre, interdite par un voisin
+    de la ligne du dessus, ou suite d'un navire vertical. S'y ajoutent le reste
+    d'un navire horizontal en cours et les navires déjà posés. Les remplissages qui
+    aboutissent au même profil sont fusionnés et leurs nombres additionnés;
+    tous les profils d'une case sont traités d'un bloc avec NumPy.
+
+    Le travail se mesure en profils traités, case après case. Avec max_work, un
+    comptage qui en traiterait davantage s'arrête et count comme cell_counts
+    renvoient None: la limite ne dépend pas de la machine, et une partie se
+    rejoue donc à l'identique.
+    """
+
+    # Nombre de transitions gardées en mémoire pour la passe arrière.
+    keep_limit = 4000000
+
+    def __init__(self, size, lengths, empty=0, full=0, max_work=None):
+        lengths = list(lengths)
+        self.size = size
+        self.max_work = max_work
+        self.work = 0
+        self.lengths = sorted(set(lengths))
+        self.fleet = [lengths.count(length) for length in self.lengths]
+        self.empty = empty
+        self.full = full
+
+        # Navires déjà posés: un chiffre par longueur, en base mixte.
+        self.radix = []
+        n_usage = 1
+        for count in self.fleet:
+            self.radix.append(n_usage)
+            n_usage *= count + 1
+        self.target = n_usage - 1
+        self.usage_bits = max(n_usage - 1, 1).bit_length()
+
+        # Code d'une colonne: 0 vide ou libre, 1 occupée ou interdite, r + 1 navire
+        # vertical auquel il reste r cases; puis le reste du navire horizontal.
+        self.width = max(self.lengths, default=1).bit_length()
+        self.code_mask = (1 << self.width) - 1
+        self.run_shift = self.width * size
+        self.previous_shift = self.run_shift + self.width
+        if self.previous_shift + 1 + self.usage_bits > 62:
+            raise ValueError("Grille trop grande pour le comptage exact")
+
+        bound = 1
+        for length in lengths:
+            bound *= 2 * size * size
+        self.dtype = np.int64 if bound < 1 << 62 else object
+        self._total = None
+        self._cells = None
+
+    def _fits(self, x, y, length, vertical):
+        """Vrai si un navire partant de (x, y) ne couvre aucune case sûrement vide
+        et n'est pas entièrement sur des touches."""
+        size = self.size
+        if vertical:
+            if y + length > size:
+                return False
+            cells = range(y * size + x, (y + length) * size + x, size)
+        else:
+            if x + length > size:
+                return False
+            cells = range(y * size + x, y * size + x + length)
+        return (not any(self.empty >> cell & 1 for cell in cells) and
+                not all(self.full >> cell & 1 for cell in cells))
+
+    def _step(self, cell, keys, values):
+        """Remplissages de la case `cell` depuis chaque profil de `keys`.
+
+        Renvoie les profils suivants (triés), leurs nombres et les transitions:
+        profil de départ, profil d'arrivée et case occupée ou non.
+        """
+        size, width, mask = self.size, self.width, self.code_mask
+        x, y = cell % size, cell // size
+        shift = width * x
+        usage = keys & ((1 << self.usage_bits) - 1)
+        states = keys >> self.usage_bits
+
+        up = states >> shift & mask
+        run = states >> self.run_shift & mask
+        base = states & ~(mask << shift) & ((1 << self.run_shift) - 1)
+        if x:
+            # La case de gauche est gardée telle quelle jusqu'ici; elle passe
+            # maintenant sous sa forme pour la ligne suivante.
+            left = states >> (shift - width) & mask
+            left_taken = left != 0
+            before = (states >> self.previous_shift & 1).astype(bool)
+            base &= ~(mask << (shift - width))
+            base_empty = base | np.where(left >= 2, left, before | left_taken) << (shift - width)
+            base_taken = base | np.where(left >= 2, left, 1) << (shift - width)
+            if x < size - 1:
+                carried = left_taken.astype(np.int64) << self.previous_shift
+                base_empty |= carried
+                base_taken |= carried
+            else:
+                base_empty |= left_taken.astype(np.int64) << shift
+        else:
+            left = np.zeros_like(states)
+            base_empty = base_taken = base
+
+        is_empty = self.empty >> cell & 1
+        is_full = self.full >> cell & 1
+        sources, following, usages, occupied = [], [], [], []
+
+        def add(where, state, is_occupied, length=None):
+            index = np.flatnonzero(where)
+            used = usage[index]
+            if length is not None:
+                count, radix = self.fleet[length], self.radix[length]
+                index = index[used // radix % (count + 1) < count]
+                used = usage[index] + radix
+            if len(index):
+                sources.append(index)
+                following.append(state[index])
+                usages.append(used)
+                occupied.append(np.full(len(index), is_occupied))
+
+        if not is_empty:
+            # Suite d'un navire vertical, puis d'un navire horizontal.
+            add(up >= 2, base_taken | np.where(up > 2, up - 1, 1) << shift, True)
+            add((run > 0) & (up == 0), base_taken | 1 << shift | (run - 1) << self.run_shift, True)
+        free = (up < 2) & (run == 0)
+        if not is_full:
+            add(free, base_empty, False)
+        if not is_empty:
+            start = (up == 0) & (run == 0) & (left == 0)
+            for i, length in enumerate(self.lengths):
+                if length == 1:
+                    if not is_full:
+                        add(start, base_taken | 1 << shift, True, i)
+                    continue
+                if self._fits(x, y, length, False):
+                    add(start, base_taken | 1 << shift | (length - 1) << self.run_shift, True, i)
+                if self._fits(x, y, length, True):
+                    add(start, base_taken | length << shift, True, i)
+
+        if not sources:
+            nothing = np.zeros(0, dtype=np.intp)
+            return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=self.dtype),
+                    (nothing, nothing, np.zeros(0, dtype=bool)))
+        sources = np.concatenate(sources)
+        keys = np.concatenate(following) << self.usage_bits | np.concatenate(usages)
+        following, targets = np.unique(keys, return_inverse=True)
+        merged = np.zeros(len(following), dtype=self.dtype)
+        np.add.at(merged, targets, values[sources])
+        return following, merged, (sources, targets, np.concatenate(occupied))
+
+    def _forward(self, first, last, keys, values, keep=False):
+        """Applique _step aux cases first..last-1; garde chaque étape si keep."""
+        steps = []
+        for cell in range(first, last):
+            self.work += len(keys)
+            if self.max_work is not None and self.work > self.max_work:
+                raise _TooMuchWork
+            following, merged, transitions = self._step(cell, keys, values)
+            if keep:
+                steps.append((values, transitions))
+            keys, values = following, merged
+        return keys, values, steps
+
+    def count(self):
+        """Nombre de flottes compatibles avec les observations, ou None si max_work est dépassé."""
+        if self._total is None:
+            try:
+                self._total = self._run()[0]
+            except _TooMuchWork:
+                return None
+        return self._total
+
+    def cell_counts(self):
+        """Pour chaque case (y * size + x), nombre de flottes compatibles qui l'occupent,
+        ou None si max_work est dépassé."""
+        if self._cells is None:
+            try:
+                self._total, self._cells = self._run(with_cells=True)
+            except _TooMuchWork:
+                return None
+        return self._cells
+
+    def _run(self, with_cells=False):
+        size = self.size
+        usage_mask = (1 << self.usage_bits) - 1
+        keys = np.zeros(1, dtype=np.int64)
+        values = np.ones(1, dtype=self.dtype)
+        # Profils gardés en début de chaque ligne pour la passe arrière, avec les
+        # transitions de la ligne tant qu'elles tiennent dans keep_limit.
+        checkpoints = []
+        kept = 0
+        for y in range(size):
+            start = (keys, values)
+            keys, values, steps = self._forward(y * size, (y + 1) * size, keys, values,
+                                                keep=with_cells)
+            kept += sum(len(transitions[0]) for _, transitions in steps)
+            checkpoints.append((start, steps if kept <= self.keep_limit else None))
+        complete = (keys & usage_mask) == self.target
+        total = int(values[complete].sum())
+        if not with_cells:
+            return total, None
+
+        counts = [0] * (size * size)
+        if not total:
+            return 0, counts
+        # Passe arrière: completions[i] compte les façons de finir la grille
+        # depuis le profil i; une ligne dont les transitions n'ont pas été
+        # gardées est recalculée depuis son début.
+        completions = complete.astype(self.dtype)
+        for y in reversed(range(size)):
+            (keys, values), steps = checkpoints[y]
+            if steps is None:
+                _, _, steps = self._forward(y * size, (y + 1) * size, keys, values, keep=True)
+            for x in reversed(range(size)):
+                values, (sources, targets, occupied) = steps[x]
+                after = completions[targets]
+                counts[y * size + x] = int((values[sources[occupied]] * after[occupied]).sum())
+                completions = np.zeros(len(values), dtype=self.dtype)
+                np.add.at(completions, sources, after)
+        return total, counts
+
+
+@lru_cache(maxsize=256)
+def exact_counts(size, lengths, empty=0, full=0, max_work=None):
+    """(total, comptes par case) pour des observations données, ou None si le
+    comptage dépasse max_work; l'ouverture, identique d'une partie à l'autre,
+    n'est calculée (ou abandonnée) qu'une fois."""
+    counter = PlacementCounter(size, lengths, empty, full, max_work)
+    counts = counter.cell_counts()
+    if counts is None:
+        return None
+    return counter.count(), tuple(counts)
+
+
+def placement_density(size, lengths, empty=0, full=0):
+    """Estimation rapide des comptes par case, quand le comptage exact est trop cher.
+
+    Chaque placement d'un navire à flot compatible avec les observations compte
+    pour ses cases: il évite les cases vides, ne borde aucune touche qu'il ne
+    couvre pas et ne repose pas tout entier sur des touches. S'il y a des
+    touches, seuls les placements qui en couvrent comptent, pondérés par le
+    carré du nombre de touches couvertes (comme ia_densite.DensityStrategy).
+    """
+    counts = [0] * (size * size)
+    for length in lengths:
+        table = placement_table(size, length)
+        for placement in table.placements:
+            mask = placement.mask
+            if mask & empty or not mask & ~full or placement.halo & ~mask & full:
+                continue
+            weight = 1
+            if full:
+                weight = bin(mask & full).count("1") ** 2
+            for cell in placement.cells:
+                counts[cell] += weight
+    return counts
+
+
+def brute_force_counts(size, lengths, empty=0, full=0):
+    """Même résultat que exact_counts, en énumérant une à une toutes les flottes.
+
+    Réservé aux petites grilles: sert à vérifier PlacementCounter.
+    """
+    lengths = sorted(lengths)
+    tables = [placement_table(size, length) for length in lengths]
+    counts = [0] * (size * size)
+    total = 0
+
+    def place(i, first, forbidden, occupied):
+        nonlocal total
+        if i == len(lengths):
+            if occupied & full == full:
+                total += 1
+                for cell in range(size * size):
+                    counts[cell] += occupied >> cell & 1
+            return
+        table = tables[i]
+        for p in range(first, len(table.masks)):
+            mask = table.masks[p]
+            if mask & (forbidden | empty) or mask & full == mask:
+                continue
+            # Deux navires de même longueur sont posés dans l'ordre de la table,
+            # pour ne compter chaque flotte qu'une fois.
+            following = p + 1 if i + 1 < len(lengths) and lengths[i + 1] == lengths[i] else 0
+            place(i + 1, following, forbidden | table.halos[p], occupied | mask)
+
+    place(0, 0, 0, 0)
+    return total, tuple(counts)
+
+
+def random_position(size, lengths, n_shots, rng):
+    """Observations (navires à flot, vides, touches) après n_shots tirs au hasard
+    sur une flotte tirée au hasard."""
+    lengths = list(lengths)
+    placements = fleet_sampler(size, tuple(lengths)).sample(rng)
+    ships = [{y * size + x for x, y in placement.positions} for placement in placements]
+    neighbours = neighbour_masks(size)
+    shots = rng.sample(range(size * size), n_shots)
+    empty = full = 0
+    for cell in shots:
+        ship = next((ship for ship in ships if cell in ship), None)
+        if ship is None:
+            empty |= 1 << cell
+            continue
+        full |= 1 << cell
+        if all(full >> c & 1 for c in ship):
+            lengths.remove(len(ship))
+            for c in ship:
+                full &= ~(1 << c)
+                empty |= neighbours[c]
+    return lengths, empty, full
+
+
+def verify(trials=200, seed=0):
+    """Compare PlacementCounter et enumerate_layouts au dénombrement brut, sur
+    des positions au hasard."""
+    rng = random.Random(seed)
+    failures = 0
+    for trial in range(trials):
+        size = rng.randint(3, 6)
+        fleet = sorted(rng.choice(((3, 2), (2, 2, 1), (3, 2, 2), (4, 3, 2), (3, 3, 2, 1))))
+        if not fleet_sampler(size, tuple(fleet)).feasible:
+            continue
+        lengths, empty, full = random_position(size, fleet, rng.randint(0, size * size // 2), rng)
+        counter = PlacementCounter(size, lengths, empty, full)
+        expected = brute_force_counts(size, lengths, empty, full)
+        if (counter.count(), tuple(counter.cell_counts())) != expected:
+            failures += 1
+            print(f"Écart: PlacementCounter({size}, {tuple(lengths)}, {empty:#x}, {full:#x}) "
+                  f"compte {counter.count()} flottes au lieu de {expected[0]}")
+        # Le solveur de fin de partie énumère les mêmes dispositions.
+        layouts = enumerate_layouts(size, lengths, empty, full, limit=expected[0])
+        if len(layouts or ()) != expected[0]:
+            failures += 1
+            print(f"Écart: enumerate_layouts({size}, {tuple(lengths)}, {empty:#x}, {full:#x}) "
+                  f"trouve {len(layouts or ())} dispositions au lieu de {expected[0]}")
+    print(f"{trials} positions vérifiées, {failures} écart(s)")
+    return failures == 0
+
+
+def hit_probabilities(size, lengths, empty=0, full=0):
+    """Probabilité exacte que chaque case soit occupée, ou None si aucune
+    flotte n'est compatible avec les observations."""
+    total, counts = exact_counts(size, tuple(sorted(lengths)), empty, full)
+    if not total:
+        return None
+    return [n / total for n in counts]
+
+
+class ExactStrategy(Strategy):
+    """Vise la case dont la probabilité d'être touchée est la plus forte.
+
+    Quand c'est possible, les probabilités sont exactes: PlacementCounter compte
+    toutes les flottes compatibles avec les tirs observés et la règle de
+    non-contact. Un comptage qui dépasserait max_work profils (environ 50 ms
+    pour la valeur par défaut) est remplacé par l'estimation heuristique de
+    placement_density: sur 10 x 10 sans livre d'ouvertures, c'est le cas
+    d'environ un coup sur trois, tous parmi les seize premiers tirs.
+    Les premiers coups sont lus dans le livre `book` (voir ouvertures.py)
+    quand il les contient. exact_moves et estimated_moves comptent les coups
+    joués de chaque façon.
+    """
+
+    def __init__(self, size=10, fleet=None, book=None, max_work=300000):
+        self.size = size
+        self.book = book
+        self.max_work = max_work
+        self.observations = Observations(size, (length for _, length in (fleet or FLEET)))
+        self.exact_moves = 0
+        self.estimated_moves = 0
+
+    def choose_shot(self, view):
+
+        seen = self.observations
+        if self.book is not None:
+            cell = self.book.lookup(self.size, seen.lengths, seen.empty, seen.open_hits)
+            if cell is not None and not seen.shots >> cell & 1:
+                return cell % self.size, cell // self.size
+        exact = exact_counts(self.size, tuple(sorted(seen.lengths)),
+                             seen.empty, seen.open_hits, self.max_work)
+        if exact is not None:
+            total, counts = exact
+            self.exact_moves += 1
+        else:
+            counts = placement_density(self.size, seen.lengths, seen.empty, seen.open_hits)
+            total = any(counts)
+            self.estimated_moves += 1
+        if not total:
+            return view.random_free_cell()
+        best_count = -1
+        best = []
+        for cell, count in enumerate(counts):
+            if seen.shots >> cell & 1:
+                continue
+            if count > best_count:
+                best_count, best = count, [cell]
+            elif count == best_count:
+                best.append(cell)
+        cell = self.rng.choice(best)
+        return cell % self.size, cell // self.size
+
+    def observe_result(self, position, hit, ship_sunk):
+
+        self.observations.record(position, hit, ship_sunk)
+
+
+class ExactPlayer(Player):
+    """Ordinateur qui joue avec ExactStrategy."""
+
+    def __init__(self, name, is_computer=True, size=10, fleet=None, book=None, rng=None,
+                 max_work=300000, endgame=False):
+        if book is None:
+            from ouvertures import opening_book
+            book = opening_book()
+        super().__init__(name, is_computer, size=size, fleet=fleet,
+                         strategy=ExactStrategy(size, fleet, book, max_work), endgame=endgame,
+                         rng=rng)
+
+
+if __name__ == "__main__":
+    # --verifier compare le comptage exact à une énumération brute des flottes.
+    if "--verifier" in sys.argv:
+        sys.exit(0 if verify() else 1)
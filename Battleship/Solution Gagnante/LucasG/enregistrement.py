@@ -0,0 +1,155 @@
+
+import struct
+import sys
+
+from bataille_navale import FLEET, Board, Ship
+from placements import placement_table
+from simulation import GameResult
+
+MAGIC = b"BNAV\x01"
+
+# Longueur de l'enregistrement (sans ce champ), graine, drapeaux, taille, nombre de navires par joueur.
+_HEADER = struct.Struct("<HQBBB")
+_SHIP = struct.Struct("<BH")
+_COUNT = struct.Struct("<H")
+
+_HAS_SEED = 1
+
+
+class GameRecord:
+    """Partie enregistrée: graine, flottes (indices de placement) et tirs (un octet chacun).
+
+    fleets contient, pour chaque joueur, la liste (longueur, indice dans
+    placement_table) de ses navires; shots contient les cases visées
+    (y * size + x) dans l'ordre, le premier joueur tirant en premier.
+    """
+
+    def __init__(self, size, fleets, shots, seed=None):
+        self.size = size
+        self.fleets = fleets
+        self.shots = bytes(shots)
+        self.seed = seed
+
+    @classmethod
+    def from_players(cls, players, history, seed=None):
+        """Enregistrement d'une partie entre players[0] (qui commence) et players[1]."""
+        size = players[0].board.size
+        if size * size > 256:
+            raise ValueError("Le format binaire est limité aux grilles de 16 x 16")
+        fleets = []
+        for player in players:
+            fleet = []
+            for ship in player.board.ships:
+                placement = placement_table(size, ship.size).find(ship.positions)
+                fleet.append((ship.size, placement.index))
+            fleets.append(fleet)
+        return cls(size, fleets, [y * size + x for x, y in history], seed)
+
+    @classmethod
+    def from_game(cls, game):
+        """Enregistrement d'une Game: le joueur humain tire en premier."""
+        return cls.from_players([game.human_player, game.computer_player], game.history)
+
+    def to_bytes(self):
+        n_ships = len(self.fleets[0])
+        body = bytearray()
+        for fleet in self.fleets:
+            for length, index in fleet:
+                body += _SHIP.pack(length, index)
+        body += _COUNT.pack(len(self.shots))
+        body += self.shots
+        flags = _HAS_SEED if self.seed is not None else 0
+        header = _HEADER.pack(_HEADER.size - 2 + len(body), self.seed or 0, flags, self.size, n_ships)
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, data):
+        _, seed, flags, size, n_ships = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        fleets = []
+        for _ in range(2):
+            fleet = []
+            for _ in range(n_ships):
+                fleet.append(_SHIP.unpack_from(data, offset))
+                offset += _SHIP.size
+            fleets.append(fleet)
+        (n_shots,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        shots = data[offset:offset + n_shots]
+        return cls(size, fleets, shots, seed if flags & _HAS_SEED else None)
+
+    def boards(self, names=None):
+        """Reconstruit les deux grilles; les navires prennent les noms de FLEET."""
+        names = names or [name for name, _ in FLEET]
+        boards = []
+        for fleet in self.fleets:
+            board = Board(self.size)
+            for name, (length, index) in zip(names, fleet):
+                ship = Ship(name, length)
+                ship.place(list(placement_table(self.size, length).placements[index].positions))
+                board.add_ship(ship)
+            boards.append(board)
+        return boards
+
+    def replay(self, names=("Joueur 1", "Joueur 2")):
+        """Rejoue les tirs et renvoie le GameResult de la partie."""
+        boards = self.boards()
+        shots = {name: 0 for name in names}
+        sink_turns = {name: {} for name in names}
+        first_hits = {name: None for name in names}
+        hit_cells = {name: [] for name in names}
+        winner = None
+        for turn, cell in enumerate(self.shots):
+            shooter, target = turn % 2, 1 - turn % 2
+            hit, ship_sunk = boards[target].shoot((cell % self.size, cell // self.size))
+            shots[names[shooter]] += 1
+            if hit:
+                if first_hits[names[shooter]] is None:
+                    first_hits[names[shooter]] = shots[names[shooter]]
+                hit_cells[names[shooter]].append((cell % self.size, cell // self.size))
+            if ship_sunk:
+                sink_turns[names[target]][ship_sunk.name] = shots[names[shooter]]
+                if boards[target].all_ships_sunk():
+                    winner = names[shooter]
+        return GameResult(winner, shots, sink_turns, first_hits, hit_cells)
+
+
+class RecordWriter:
+    """Écrit des GameRecord à la suite dans un fichier binaire."""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+
+    def write(self, record):
+        self.file.write(record.to_bytes())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path):
+    """Parcourt les parties d'un fichier une à une, sans tout charger en mémoire."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de parties enregistrées")
+        while True:
+            prefix = file.read(2)
+            if not prefix:
+                return
+            (length,) = _COUNT.unpack(prefix)
+            yield GameRecord.from_bytes(prefix + file.read(length))
+
+
+if __name__ == "__main__":
+    games = shots = 0
+    for record in read_records(sys.argv[1]):
+        games += 1
+        shots += len(record.shots)
+    print(f"{games} parties, {shots / max(games, 1):.1f} tirs par partie en moyenne")
@@ -0,0 +1,274 @@
+
+from functools import lru_cache
+
+from placements import placement_table
+from strategies import Observations, Strategy
+
+
+def enumerate_layouts(size, lengths, empty=0, full=0, limit=64):
+    """Dispositions des navires `lengths` compatibles avec les observations.
+
+    `empty` et `full` ont le même sens que pour comptage_exact.PlacementCounter;
+    comme lui, aucun navire ne repose tout entier sur des touches.
+
+    Chaque disposition est le masque des cases occupées: les navires ne se
+    touchant pas, il suffit à les retrouver. Renvoie None s'il y en a plus
+    de `limit`.
+    """
+    tables = {length: placement_table(size, length) for length in set(lengths)}
+    layouts = set()
+
+    def place(remaining, forbidden, occupied, first):
+        uncovered = full & ~occupied
+        if uncovered:
+            # Chaque touche encore inexpliquée doit être couverte par un navire
+            # qui ne touche aucune autre touche.
+            cell = (uncovered & -uncovered).bit_length() - 1
+            for length in set(remaining):
+                table = tables[length]
+                rest = list(remaining)
+                rest.remove(length)
+                for p in table.by_cell[cell]:
+                    mask = table.masks[p]
+                    if mask & forbidden or table.halos[p] & ~mask & full or not mask & ~full:
+                        continue
+                    if not place(rest, forbidden | table.halos[p], occupied | mask, 0):
+                        return False
+            return True
+
+        if not remaining:
+            layouts.add(occupied)
+            return len(layouts) <= limit
+        # Deux navires de même longueur sont posés dans l'ordre de la table.
+        length, rest = remaining[0], remaining[1:]
+        table = tables[length]
+        for p in range(first, len(table)):
+            if table.masks[p] & forbidden:
+                continue
+            following = p + 1 if rest and rest[0] == length else 0
+            if not place(rest, forbidden | table.halos[p], occupied | table.masks[p], following):
+                return False
+        return True
+
+    if not place(sorted(lengths, reverse=True), empty, 0, 0):
+        return None
+    return list(layouts)
+
+
+class _SearchAborted(Exception):
+    pass
+
+
+class EndgameSolver:
+    """Séquence de tirs qui minimise l'espérance du nombre de tirs restants.
+
+    Les dispositions encore possibles sont équiprobables. Un tir les partage
+    selon sa réponse (à l'eau, touché, ou coulé avec les cases du navire); la
+    valeur d'une position est la somme, sur ses dispositions, des tirs qu'il
+    faut encore pour tout couler. Elle ne dépend que des touches et de
+    l'ensemble des dispositions: c'est la clé de la table de transposition,
+    partagée entre les coups et les parties.
+
+    Une case occupée dans toutes les dispositions est tirée d'office. Sinon les
+    cases sont essayées de la plus probable à la moins probable. Chaque
+    disposition demande au moins ses cases encore intactes: cette borne
+    inférieure coupe un tir dès qu'il ne peut plus battre le meilleur trouvé,
+    et chaque sous-position n'est cherchée que sous la valeur qui lui reste.
+    La table garde alors une borne inférieure au lieu d'une valeur exacte.
+    """
+
+    def __init__(self, size, max_entries=500000):
+        self.size = size
+        self.max_entries = max_entries
+        self.table = {}
+        self.ships = {}
+        self.budget = None
+
+    def best_shot(self, layouts, hits, max_nodes=None):
+        """(case à viser, nombre moyen de tirs restants), ou (None, 0.0) si tout est coulé.
+
+        Renvoie None si la recherche demande plus de max_nodes nouvelles
+        positions; celles déjà résolues restent dans la table.
+        """
+        self.budget = max_nodes
+        try:
+            total, cell, _ = self._solve(hits, frozenset(layouts), float("inf"))
+        except _SearchAborted:
+            return None
+        return cell, total / len(layouts)
+
+    def _ships(self, layout):
+        """Pour chaque case de `layout`, le masque du navire qui l'occupe."""
+        ships = self.ships.get(layout)
+        if ships is None:
+            size = self.size
+            ships = {}
+            cells = layout
+            while cells:
+                cell = (cells & -cells).bit_length() - 1
+                # Case la plus haute à gauche du navire: il part vers la droite ou vers le bas.
+                step = 1 if cell % size + 1 < size and layout >> (cell + 1) & 1 else size
+                ship = 0
+                current = cell
+                while current < size * size and layout >> current & 1:
+                    ship |= 1 << current
+                    if step == 1 and current % size == size - 1:
+                        break
+                    current += step
+                cells &= ~ship
+                while ship:
+                    low = ship & -ship
+                    ships[low.bit_length() - 1] = ship
+                    ship ^= low
+            self.ships[layout] = ships
+        return ships
+
+    def _split(self, hits, layouts, cell):
+        """Positions qui suivent un tir sur `cell`, une par réponse possible,
+        avec la borne inférieure de chacune."""
+        bit = 1 << cell
+        outcomes = {}
+        for layout in layouts:
+            if not layout & bit:
+                outcomes.setdefault(None, []).append(layout)
+                continue
+            ship = self._ships(layout)[cell]
+            sunk = ship if not ship & ~(hits | bit) else 0
+            outcomes.setdefault(sunk, []).append(layout)
+
+        children = []
+        for answer, group in outcomes.items():
+            child_hits = hits if answer is None else hits | bit
+            bound = sum(bin(layout & ~child_hits).count("1") for layout in group)
+            children.append((child_hits, frozenset(group), bound))
+        return children
+
+    def _expand(self, count, children, limit):
+        """Valeur d'un tir de fils `children`, ou borne inférieure >= limit."""
+        total = count + sum(bound for _, _, bound in children)
+        for hits, layouts, bound in children:
+            if total >= limit:
+                break
+            value = self._solve(hits, layouts, limit - total + bound)[0]
+            total += value - bound
+        return total
+
+    def _solve(self, hits, layouts, limit):
+        """(valeur, case, exacte); une valeur non exacte est une borne inférieure >= limit."""
+        key = (hits, layouts)
+        entry = self.table.get(key)
+        if entry is not None and (entry[2] or entry[0] >= limit):
+            return entry
+
+        if self.budget is not None:
+            if not self.budget:
+                raise _SearchAborted
+            self.budget -= 1
+
+        count = len(layouts)
+        needed = [layout & ~hits for layout in layouts]
+        sure = needed[0]
+        for cells in needed:
+            sure &= cells
+        bound = sum(bin(cells).count("1") for cells in needed)
+
+        if not bound:
+            entry = (0, None, True)
+        elif bound >= limit:
+            entry = (bound, None, False)
+        elif sure:
+            cell = (sure & -sure).bit_length() - 1
+            value = self._expand(count, self._split(hits, layouts, cell), limit)
+            entry = (value, cell, value < limit)
+        else:
+            frequency = {}
+            for cells in needed:
+                while cells:
+                    low = cells & -cells
+                    cell = low.bit_length() - 1
+                    frequency[cell] = frequency.get(cell, 0) + 1
+                    cells ^= low
+            best, best_cell = limit, None
+            for cell in sorted(frequency, key=frequency.get, reverse=True):
+                # Chaque disposition touchée par ce tir a une case de moins à découvrir.
+                if count + bound - frequency[cell] >= best:
+                    break
+                value = self._expand(count, self._split(hits, layouts, cell), best)
+                if value < best:
+                    best, best_cell = value, cell
+                    if best == count + bound - frequency[cell]:
+                        break
+            entry = (best, best_cell, best_cell is not None)
+
+        if len(self.table) >= self.max_entries:
+            self.table.clear()
+            self.ships.clear()
+        self.table[key] = entry
+        return entry
+
+
+@lru_cache(maxsize=None)
+def endgame_solver(size):
+    """Solveur partagé par les joueurs d'un même processus (voir EndgameStrategy)."""
+    return EndgameSolver(size)
+
+
+class EndgameStrategy(Strategy):
+    """Laisse jouer `base`, sauf en fin de partie où EndgameSolver prend la main.
+
+    La fin de partie commence quand il reste au plus max_unknown cases de
+    navire non touchées et au plus max_layouts dispositions possibles; un coup
+    dont la recherche dépasse max_nodes positions est laissé à `base`, de même
+    que les coups suivants tant qu'il reste autant de dispositions. Les
+    grilles de plus de max_size de côté ne sont pas suivies.
+
+    Chaque partie a sa propre table, d'au plus max_entries positions, que les
+    coups suivants réutilisent et qui disparaît avec la partie: le coup joué
+    ne dépend que de la partie en cours. Avec une table partagée (solver =
+    endgame_solver(size)), la recherche va plus vite mais le dépassement de
+    max_nodes, donc le coup joué, dépend des parties déjà jouées par le
+    processus, et une partie ne se rejoue plus à partir de sa graine.
+    """
+
+    def __init__(self, base, size=10, fleet=None, max_unknown=6, max_layouts=6,
+                 max_nodes=100, max_size=16, solver=None, max_entries=20000):
+        self.base = base
+        self.solver = solver or EndgameSolver(size, max_entries)
+        self.size = size
+        self.observations = Observations(size, (length for _, length in fleet or ()))
+        self.max_unknown = max_unknown
+        self.max_layouts = max_layouts
+        self.max_nodes = max_nodes
+        self.active = bool(fleet) and size <= max_size
+        # Nombre de dispositions de la dernière recherche abandonnée.
+        self.aborted_at = None
+
+    def set_rng(self, rng):
+        self.rng = rng
+        self.base.set_rng(rng)
+
+    def place_fleet(self, board, ships):
+        return self.base.place_fleet(board, ships)
+
+    def choose_shot(self, view):
+
+        seen = self.observations
+        if self.active and seen.lengths:
+            unknown = sum(seen.lengths) - bin(seen.open_hits).count("1")
+            if unknown <= self.max_unknown:
+                layouts = enumerate_layouts(self.size, seen.lengths, seen.empty, seen.open_hits,
+                                            self.max_layouts)
+                if layouts and (self.aborted_at is None or len(layouts) < self.aborted_at):
+                    best = self.solver.best_shot(layouts, seen.open_hits, self.max_nodes)
+                    if best is None:
+                        self.aborted_at = len(layouts)
+                    elif best[0] is not None:
+                        cell = best[0]
+                        return cell % self.size, cell // self.size
+        return self.base.choose_shot(view)
+
+    def observe_result(self, position, hit, ship_sunk):
+
+        if self.active:
+            self.observations.record(position, hit, ship_sunk)
+        self.base.observe_result(position, hit, ship_sunk)
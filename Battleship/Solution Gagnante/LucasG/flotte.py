@@ -0,0 +1,165 @@
+
+import random
+from functools import lru_cache
+
+from placements import placement_table
+
+
+class _TooManyStates(Exception):
+    """Le comptage exact dépasse count_limit états."""
+
+
+class FleetSampler:
+    """Tire des flottes complètes uniformément parmi toutes les dispositions légales.
+
+    Chaque navire reçoit un placement tiré uniformément dans sa table et le
+    tirage est rejeté dès qu'un navire empiète sur le halo d'un autre: les
+    flottes acceptées sont donc uniformes. Pour limiter les rejets, toutes les
+    combinaisons compatibles des premiers navires (les plus longs) sont
+    énumérées d'avance tant qu'elles restent moins de prefix_limit. Si
+    `touching` est vrai, les navires peuvent se toucher sans se chevaucher.
+
+    Sur une grille très remplie presque tous les tirages sont rejetés. Après
+    max_rejections rejets pour un même tirage, l'échantillonneur compte une
+    fois pour toutes les dispositions restantes de chaque état (navires déjà
+    placés, cases interdites) puis tire chaque navire à son tour avec un poids
+    égal à ce nombre: le tirage reste uniforme et ne rejette plus rien. Si le
+    comptage dépasse count_limit états, les tirages renvoient None.
+    """
+
+    def __init__(self, size, lengths, prefix_limit=50000, touching=False,
+                 max_rejections=100000, count_limit=1000000):
+        self.size = size
+        self.lengths = tuple(lengths)
+        self.touching = touching
+        self.max_rejections = max_rejections
+        self.count_limit = count_limit
+        # Nombre de dispositions restantes par état, pour chaque profondeur;
+        # None tant que le rejet suffit, False si le comptage est trop gros.
+        self.counts = None
+        self.n_states = 0
+        # Les plus longs d'abord: ce sont eux qui provoquent le plus de rejets.
+        self.order = sorted(range(len(self.lengths)), key=lambda i: -self.lengths[i])
+        self.tables = [placement_table(size, self.lengths[i], touching) for i in self.order]
+        self.feasible = self._exists(0, 0)
+
+        self.prefixes = [(0, ())]
+        self.depth = 0
+        for table in self.tables:
+            if len(self.prefixes) * len(table) > prefix_limit:
+                break
+            self.prefixes = [(forbidden | table.halos[p], chosen + (p,))
+                             for forbidden, chosen in self.prefixes
+                             for p in table.compatible(forbidden)]
+            self.depth += 1
+
+    def _exists(self, depth, forbidden, dead_ends=None):
+        """Vrai si les navires restants peuvent encore tous être placés."""
+        if depth == len(self.tables):
+            return True
+        if dead_ends is None:
+            dead_ends = set()
+        if (depth, forbidden) in dead_ends:
+            return False
+        table = self.tables[depth]
+        for p in table.compatible(forbidden):
+            if self._exists(depth + 1, forbidden | table.halos[p], dead_ends):
+                return True
+        dead_ends.add((depth, forbidden))
+        return False
+
+    def _count(self, depth, forbidden):
+        """Nombre de façons de placer les navires restants à partir de cet état."""
+        if depth == len(self.tables):
+            return 1
+        memo = self.counts[depth]
+        n = memo.get(forbidden)
+        if n is None:
+            table = self.tables[depth]
+            halos = table.halos
+            n = 0
+            if depth + 1 == len(self.tables):
+                n = len(table.compatible(forbidden))
+            else:
+                for p in table.compatible(forbidden):
+                    n += self._count(depth + 1, forbidden | halos[p])
+            memo[forbidden] = n
+            self.n_states += 1
+            if self.n_states > self.count_limit:
+                raise _TooManyStates
+        return n
+
+    def _build_counts(self):
+        self.counts = [{} for _ in self.tables]
+        self.n_states = 0
+        try:
+            self._count(0, 0)
+        except _TooManyStates:
+            self.counts = False
+
+    def _weighted_sample(self, rng):
+        """Tire chaque navire à son tour, pondéré par les dispositions qu'il laisse."""
+        forbidden = 0
+        chosen = []
+        for depth, table in enumerate(self.tables):
+            target = rng.randrange(self._count(depth, forbidden))
+            for p in table.compatible(forbidden):
+                target -= self._count(depth + 1, forbidden | table.halos[p])
+                if target < 0:
+                    break
+            forbidden |= table.halos[p]
+            chosen.append(p)
+        return chosen
+
+    def _rejection_sample(self, rng):
+        """Tirage par rejet, ou None après max_rejections rejets."""
+        rest = self.tables[self.depth:]
+        choice = rng.choice
+        randrange = rng.randrange
+        for _ in range(self.max_rejections):
+            forbidden, chosen = choice(self.prefixes)
+            for table in rest:
+                p = randrange(len(table.masks))
+                if table.masks[p] & forbidden:
+                    break
+                forbidden |= table.halos[p]
+                chosen += (p,)
+            else:
+                return chosen
+        return None
+
+    def sample_indices(self, rng=random):
+        """Indices de placement de chaque navire, dans l'ordre de self.lengths, ou None.
+
+        `rng` est le générateur du tirage (un random.Random ou le module random).
+        """
+        if not self.feasible:
+            return None
+
+        chosen = None
+        if self.counts is None:
+            chosen = self._rejection_sample(rng)
+            if chosen is None:
+                self._build_counts()
+        if chosen is None:
+            if not self.counts:
+                return None
+            chosen = self._weighted_sample(rng)
+        indices = [0] * len(chosen)
+        for position, i in enumerate(self.order):
+            indices[i] = chosen[position]
+        return indices
+
+    def sample(self, rng=random):
+        """Placements de chaque navire, dans l'ordre de self.lengths, ou None."""
+        indices = self.sample_indices(rng)
+        if indices is None:
+            return None
+        return [placement_table(self.size, length, self.touching).placements[p]
+                for length, p in zip(self.lengths, indices)]
+
+
+@lru_cache(maxsize=None)
+def fleet_sampler(size, lengths, touching=False):
+    """Échantillonneur partagé pour une taille de grille et une liste de longueurs."""
+    return FleetSampler(size, lengths, touching=touching)
@@ -0,0 +1,227 @@
+
+import random
+
+from bataille_navale import FLEET, FreeCells, column_label
+from regles import rule_set
+
+
+def large_fleet(copies):
+    """La flotte standard répétée `copies` fois, navires numérotés."""
+    return [(f"{name} {i + 1}", size) for i in range(copies) for name, size in FLEET]
+
+
+class SparseBoard:
+    """Grille de grande taille (ex. 1000 x 1000) qui ne stocke que les cases utiles.
+
+    Seules les cases occupées (ship_at) et les cases visées (shots, hits) sont
+    conservées: le placement et le tir coûtent le même prix quelle que soit la
+    surface de la grille. Elle s'utilise comme Board, y compris comme grille
+    adverse d'un Player. Seul le contact entre navires est lu dans `rules`: les
+    tables de placements de regles.py seraient trop grandes à cette échelle.
+    Quand un navire ne trouve pas de place au hasard, ses positions légales sont
+    comptées ligne par ligne; une fois la moitié de la grille visée, les cases
+    libres sont tenues à jour une à une.
+    """
+
+    __slots__ = ("size", "rng", "rules", "ships", "shots", "hits", "ship_at", "ships_afloat",
+                 "free")
+
+    def __init__(self, size=1000, rng=None, rules=None):
+        self.size = size
+        self.rng = rng or random
+        self.rules = rules or rule_set(size)
+        self.ships = []
+        self.shots = set()
+        self.hits = set()
+        self.ship_at = {}
+        self.ships_afloat = 0
+        # Cases jamais visées, construites quand le tirage par rejet devient lent.
+        self.free = None
+
+    def is_shot(self, position):
+        return position in self.shots
+
+    def add_ship(self, ship):
+
+        self.ships.append(ship)
+        self.ships_afloat += 1
+        for position in ship.positions:
+            self.ship_at[position] = ship
+
+    def _remove_ship(self, ship):
+        self.ships.remove(ship)
+        self.ships_afloat -= 1
+        for position in ship.positions:
+            del self.ship_at[position]
+
+    def can_place_ship(self, positions):
+        for x, y in positions:
+            if x < 0 or x >= self.size or y < 0 or y >= self.size:
+                return False
+
+        if self.rules.touching:
+            return not any(position in self.ship_at for position in positions)
+        # Ni chevauchement ni contact, même en diagonale, comme Board.
+        for x, y in positions:
+            for dx in [-1, 0, 1]:
+                for dy in [-1, 0, 1]:
+                    if (x + dx, y + dy) in self.ship_at:
+                        return False
+        return True
+
+    def place_ship_randomly(self, ship):
+        max_attempts = 100
+        for _ in range(max_attempts):
+            rng = self.rng
+            if rng.randint(0, 1) == 0:
+                x = rng.randint(0, self.size - ship.size)
+                y = rng.randint(0, self.size - 1)
+                positions = [(x + i, y) for i in range(ship.size)]
+            else:
+                x = rng.randint(0, self.size - 1)
+                y = rng.randint(0, self.size - ship.size)
+                positions = [(x, y + i) for i in range(ship.size)]
+
+            if self.can_place_ship(positions):
+                ship.place(positions)
+                self.add_ship(ship)
+                return True
+
+        return self._place_by_scan(ship)
+
+    def _segments(self, length, vertical):
+        """Départs possibles d'un navire de `length` cases, ligne par ligne.
+
+        Chaque segment (ligne, début, nombre) autorise `nombre` départs à partir de
+        `début`; en vertical, la ligne est une colonne. Le coût dépend du nombre de
+        cases occupées et du côté de la grille, pas de sa surface.
+        """
+        reach = 0 if self.rules.touching else 1
+        blocked = {}
+        for x, y in self.ship_at:
+            line, along = (x, y) if vertical else (y, x)
+            for neighbour in range(line - reach, line + reach + 1):
+                blocked.setdefault(neighbour, set()).update(range(along - reach, along + reach + 1))
+
+        segments = []
+        for line in range(self.size):
+            start = 0
+            for stop in sorted(blocked.get(line, ())) + [self.size]:
+                if stop - start >= length:
+                    segments.append((line, start, stop - start - length + 1))
+                start = max(start, stop + 1)
+        return segments
+
+    def _place_by_scan(self, ship):
+        """Place le navire au hasard parmi toutes ses positions légales, ou renvoie False."""
+        options = [(vertical, segment) for vertical in (False, True)
+                   for segment in self._segments(ship.size, vertical)]
+        total = sum(count for _, (_, _, count) in options)
+        if not total:
+            return False
+
+        k = self.rng.randrange(total)
+        for vertical, (line, start, count) in options:
+            if k < count:
+                break
+            k -= count
+        if vertical:
+            positions = [(line, start + k + i) for i in range(ship.size)]
+        else:
+            positions = [(start + k + i, line) for i in range(ship.size)]
+        ship.place(positions)
+        self.add_ship(ship)
+        return True
+
+    def place_all_ships_randomly(self, ships, restarts=10):
+
+        # Un navire sans place peut venir des positions tirées pour les
+        # précédents: on retire toute la flotte et on recommence.
+        for _ in range(restarts):
+            placed = []
+            for ship in ships:
+                if not self.place_ship_randomly(ship):
+                    break
+                placed.append(ship)
+            else:
+                return True
+            # On ne laisse pas une flotte à moitié placée.
+            for done in placed:
+                self._remove_ship(done)
+        return False
+
+    def shoot(self, position):
+
+        if position in self.shots:
+            return None, None
+
+        self.mark_shot(position)
+
+        ship = self.ship_at.get(position)
+        if ship is None:
+            return False, None
+
+        ship.is_hit(position)
+        self.hits.add(position)
+        if ship.is_sunk():
+            self.ships_afloat -= 1
+            return True, ship
+        return True, None
+
+    def mark_shot(self, position):
+        """Note un tir en `position` et la retire des cases libres."""
+        if position in self.shots:
+            return
+        self.shots.add(position)
+        if self.free is not None:
+            x, y = position
+            self.free.remove(y * self.size + x)
+
+    def random_free_cell(self):
+        """Case jamais visée tirée au hasard, par rejet tant que la grille est peu visée."""
+        size = self.size
+        if self.free is None:
+            if len(self.shots) * 2 < size * size:
+                while True:
+                    position = (self.rng.randrange(size), self.rng.randrange(size))
+                    if position not in self.shots:
+                        return position
+            # Construite une seule fois, puis mise à jour par mark_shot.
+            self.free = FreeCells(size, (y * size + x for y in range(size) for x in range(size)
+                                         if (x, y) not in self.shots))
+        return self.free.choice(self.rng)
+
+    def record_result(self, position, hit):
+        self.mark_shot(position)
+        if hit:
+            self.hits.add(position)
+
+    def all_ships_sunk(self):
+
+        return self.ships_afloat == 0
+
+    def display(self, hide_ships=False, origin=(0, 0), span=26):
+        """Affiche la fenêtre de span x span cases dont le coin haut gauche est origin."""
+        left, top = origin
+        columns = range(left, min(left + span, self.size))
+        width = len(column_label(columns[-1]))
+        row_width = len(str(min(top + span, self.size)))
+
+        header = ' ' * (row_width + 1) + ' '.join(column_label(x).ljust(width) for x in columns)
+        rows = [header.rstrip()]
+        for y in range(top, min(top + span, self.size)):
+            cells = []
+            for x in columns:
+                position = (x, y)
+                if position in self.hits:
+                    cell = 'X'
+                elif position in self.shots:
+                    cell = '-'
+                elif position in self.ship_at and not hide_ships:
+                    cell = 'O'
+                else:
+                    cell = '~'
+                cells.append(cell.ljust(width))
+            rows.append((f'{y + 1:{row_width}d} ' + ' '.join(cells)).rstrip())
+
+        return '\n'.join(rows)
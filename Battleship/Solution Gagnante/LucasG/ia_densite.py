@@ -0,0 +1,130 @@
+
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from bataille_navale import FLEET, Player
+from placements import placement_table
+from strategies import Observations, Strategy
+
+
+class PlacementArrays:
+    """Table de placements (voir placements.py) convertie en tableaux NumPy."""
+
+    def __init__(self, size, length):
+        table = placement_table(size, length)
+        n_cells = size * size
+        self.cells = np.array([placement.cells for placement in table.placements],
+                              dtype=np.intp).reshape(-1, length)
+        self.cover = np.zeros((len(table), n_cells), dtype=np.int32)
+        halo = np.zeros((len(table), n_cells), dtype=bool)
+        for placement in table.placements:
+            self.cover[placement.index, placement.cells] = 1
+            around = placement.halo & ~placement.mask
+            for cell in range(n_cells):
+                if around >> cell & 1:
+                    halo[placement.index, cell] = True
+
+        # Pour chaque case, les placements qui l'occupent et ceux qui la bordent.
+        self.by_cell = [np.flatnonzero(self.cover[:, c]) for c in range(n_cells)]
+        self.by_halo = [np.flatnonzero(halo[:, c]) for c in range(n_cells)]
+
+
+@lru_cache(maxsize=None)
+def placement_arrays(size, length):
+    return PlacementArrays(size, length)
+
+
+class DensityStrategy(Strategy):
+    """Vise la case couverte par le plus de placements encore possibles.
+
+    Le nombre de placements légaux des navires restants qui couvrent chaque case
+    est tenu à jour à chaque tir: seuls les placements touchant la case visée
+    sont retirés. Tant qu'un navire touché n'est pas coulé, seuls les placements
+    qui passent par les touches en cours sont comptés (mode cible).
+    """
+
+    def __init__(self, size=10, fleet=None):
+        self.size = size
+        self.observations = Observations(size, (length for _, length in (fleet or FLEET)))
+        self.tables = {length: placement_arrays(size, length)
+                       for length in self.observations.lengths}
+        self.valid = {length: np.ones(len(table.cells), dtype=bool)
+                      for length, table in self.tables.items()}
+        self.counts = {length: table.cover.sum(axis=0)
+                       for length, table in self.tables.items()}
+        self.shot = np.zeros(size * size, dtype=bool)
+
+    def _invalidate(self, length, placements):
+        placements = placements[self.valid[length][placements]]
+        if len(placements):
+            self.valid[length][placements] = False
+            self.counts[length] -= self.tables[length].cover[placements].sum(axis=0)
+
+    def _density(self):
+        size = self.size
+        scores = np.zeros(size * size, dtype=np.int64)
+        seen = self.observations
+        remaining = Counter(seen.lengths)
+
+        if seen.open_hits:
+            hits = np.array([cell for cell in range(size * size) if seen.open_hits >> cell & 1],
+                            dtype=np.intp)
+            for length, table in self.tables.items():
+                if not remaining[length]:
+                    continue
+                candidates = np.unique(np.concatenate([table.by_cell[c] for c in hits]))
+                candidates = candidates[self.valid[length][candidates]]
+                if not len(candidates):
+                    continue
+                cover = table.cover[candidates]
+                # Un placement qui explique plusieurs touches pèse davantage.
+                weights = cover[:, hits].sum(axis=1) ** 2
+                scores += remaining[length] * (weights @ cover)
+            if scores.any():
+                return scores
+
+        for length, count in self.counts.items():
+            if remaining[length]:
+                scores += remaining[length] * count
+        return scores
+
+    def choose_shot(self, view):
+
+        scores = self._density()
+        scores[self.shot] = -1
+        best = np.flatnonzero(scores == scores.max())
+        cell = int(self.rng.choice(best))
+        return cell % self.size, cell // self.size
+
+    def observe_result(self, position, hit, ship_sunk):
+
+        x, y = position
+        size = self.size
+        cell = y * size + x
+        self.shot[cell] = True
+        self.observations.record(position, hit, ship_sunk)
+
+        if not hit:
+            for length, table in self.tables.items():
+                self._invalidate(length, table.by_cell[cell])
+            return
+
+        for length, table in self.tables.items():
+            self._invalidate(length, table.by_halo[cell])
+
+        if ship_sunk:
+            for sx, sy in ship_sunk.positions:
+                sunk_cell = sy * size + sx
+                for length, table in self.tables.items():
+                    self._invalidate(length, table.by_cell[sunk_cell])
+                    self._invalidate(length, table.by_halo[sunk_cell])
+
+
+class DensityPlayer(Player):
+    """Ordinateur qui joue avec DensityStrategy."""
+
+    def __init__(self, name, is_computer=True, size=10, fleet=None, rng=None, endgame=False):
+        super().__init__(name, is_computer, size=size, fleet=fleet,
+                         strategy=DensityStrategy(size, fleet), endgame=endgame, rng=rng)
@@ -0,0 +1,224 @@
+
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from bataille_navale import FLEET, Player
+from placements import placement_table
+from strategies import Observations, Strategy
+
+
+def _pack(masks, n_words):
+    """Masques (entiers Python) en tableau NumPy de mots de 64 bits, un masque par ligne."""
+    return np.array([[mask >> (64 * w) & 0xFFFFFFFFFFFFFFFF for w in range(n_words)]
+                     for mask in masks], dtype=np.uint64).reshape(-1, n_words)
+
+
+@lru_cache(maxsize=None)
+def packed_placements(size, length):
+    """Masques et halos de la table de placements, en mots de 64 bits, et les
+    masques d'origine dans un tableau d'objets."""
+    table = placement_table(size, length)
+    n_words = (size * size + 63) // 64
+    originals = np.empty(len(table), dtype=object)
+    originals[:] = table.masks
+    return _pack(table.masks, n_words), _pack(table.halos, n_words), originals
+
+
+class MonteCarloStrategy(Strategy):
+    """Tire sur la case la plus souvent occupée dans des flottes tirées au sort.
+
+    Les flottes échantillonnées respectent les tirs observés (à l'eau, touchés,
+    coulés) et la règle de non-contact de Board.can_place_ship. Les échantillons
+    encore cohérents sont conservés d'un tour à l'autre et complétés par au plus
+    draws_per_move tirages par coup: le nombre de tirages, et non le temps,
+    borne le travail, et une partie avec graine se rejoue à l'identique. Une
+    limite en secondes (time_budget) peut s'y ajouter, au prix de cette
+    reproductibilité. Les navires qui expliquent une
+    touche sont placés en premier: la loi obtenue approche la loi a posteriori
+    sans lui être exactement égale.
+
+    Sans touche en cours, les flottes sont tirées par lots de batch_size avec
+    NumPy (_draw_batch), selon la même loi que _sample; avec des touches à
+    expliquer, elles sont tirées une à une par _sample.
+    """
+
+    def __init__(self, size=10, fleet=None, draws_per_move=512, max_samples=2000,
+                 batch_size=512, time_budget=None):
+        self.size = size
+        self.draws_per_move = draws_per_move
+        self.time_budget = time_budget
+        self.max_samples = max_samples
+        self.batch_size = batch_size
+        # Les longueurs à flot, des plus longues aux plus courtes: les masques
+        # d'un échantillon sont rangés dans cet ordre.
+        self.observations = Observations(
+            size, sorted((length for _, length in (fleet or FLEET)), reverse=True))
+        self.lengths = self.observations.lengths
+        self.tables = {length: placement_table(self.size, length) for length in self.lengths}
+        self.samples = []
+
+    def _sample(self):
+        """Une flotte cohérente (masques alignés sur self.lengths), ou None."""
+        seen = self.observations
+        unplaced = list(range(len(self.lengths)))
+        layout = [0] * len(self.lengths)
+        forbidden = seen.empty
+        covered = 0
+
+        while seen.open_hits & ~covered:
+            remaining = seen.open_hits & ~covered
+            cell = (remaining & -remaining).bit_length() - 1
+            options = []
+            for i in unplaced:
+                table = self.tables[self.lengths[i]]
+                masks, halos = table.masks, table.halos
+                for p in table.by_cell[cell]:
+                    # Le halo ne doit toucher aucune autre touche.
+                    if not masks[p] & forbidden and not (halos[p] & ~masks[p]) & seen.open_hits:
+                        options.append((i, p))
+            if not options:
+                return None
+            i, p = self.rng.choice(options)
+            placement = self.tables[self.lengths[i]].placements[p]
+            layout[i] = placement.mask
+            covered |= placement.mask
+            forbidden |= placement.halo
+            unplaced.remove(i)
+
+        forbidden |= seen.open_hits
+        for i in unplaced:
+            table = self.tables[self.lengths[i]]
+            for _ in range(20):
+                placement = table.placements[self.rng.randrange(len(table))]
+                if not placement.mask & forbidden:
+                    break
+            else:
+                placement = table.random_placement(forbidden, self.rng)
+                if placement is None:
+                    return None
+            layout[i] = placement.mask
+            forbidden |= placement.halo
+        return tuple(layout)
+
+    def _draw_batch(self, n):
+        """n flottes sans touche à expliquer, tirées d'un bloc selon la même loi que
+        _sample: chaque navire reçoit un placement au hasard hors des cases vides,
+        tiré jusqu'à 20 fois en tout pour les flottes où il touche un navire
+        précédent, puis, comme dans _sample, parmi les placements encore libres de
+        la flotte. Renvoie les flottes réussies.
+        """
+        n_words = (self.size * self.size + 63) // 64
+        # Générateur NumPy tiré de self.rng: une partie avec graine se rejoue.
+        generator = np.random.default_rng(self.rng.getrandbits(64))
+        empty = _pack([self.observations.empty], n_words)
+        forbidden = np.zeros((n, n_words), dtype=np.uint64)
+        ok = np.ones(n, dtype=bool)
+        columns = []
+        for length in self.lengths:
+            masks, halos, originals = packed_placements(self.size, length)
+            candidates = np.flatnonzero(~(masks & empty).any(axis=1))
+            if not len(candidates):
+                return []
+            picks = candidates[generator.integers(len(candidates), size=n)]
+            for _ in range(19):
+                clash = np.flatnonzero((masks[picks] & forbidden).any(axis=1))
+                if not len(clash):
+                    break
+                picks[clash] = candidates[generator.integers(len(candidates), size=len(clash))]
+            table = self.tables[length]
+            for row in np.flatnonzero(ok & (masks[picks] & forbidden).any(axis=1)):
+                taken = self.observations.empty
+                for w, word in enumerate(forbidden[row]):
+                    taken |= int(word) << (64 * w)
+                placement = table.random_placement(taken, self.rng)
+                if placement is None:
+                    ok[row] = False
+                else:
+                    picks[row] = placement.index
+            forbidden |= halos[picks]
+            columns.append(originals[picks])
+
+        rows = np.flatnonzero(ok)
+        return list(zip(*(column[rows] for column in columns)))
+
+    def _consistent(self, layout):
+        seen = self.observations
+        union = 0
+        for mask in layout:
+            # Un navire entièrement touché aurait déjà été annoncé coulé.
+            if mask & seen.hits == mask:
+                return False
+            union |= mask
+        return not union & seen.misses and union & seen.open_hits == seen.open_hits
+
+    def _refill(self):
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+        draws = 0
+        while (len(self.samples) < self.max_samples and draws < self.draws_per_move
+               and (deadline is None or time.perf_counter() < deadline)):
+            n = min(self.batch_size, self.max_samples - len(self.samples),
+                    self.draws_per_move - draws)
+            draws += n
+            if not self.observations.open_hits:
+                self.samples.extend(self._draw_batch(n))
+                continue
+            for _ in range(n):
+                layout = self._sample()
+                if layout is not None:
+                    self.samples.append(layout)
+
+    def _occupancy(self):
+        """Nombre d'échantillons occupant chaque case, calculé en bloc."""
+        n_cells = self.size * self.size
+        n_bytes = (n_cells + 7) // 8
+        unions = bytearray()
+        for layout in self.samples:
+            union = 0
+            for mask in layout:
+                union |= mask
+            unions += union.to_bytes(n_bytes, "little")
+        bits = np.unpackbits(np.frombuffer(bytes(unions), dtype=np.uint8).reshape(-1, n_bytes),
+                             axis=1, bitorder="little")
+        return bits[:, :n_cells].sum(axis=0)
+
+    def choose_shot(self, view):
+
+        self._refill()
+        if not self.samples:
+            return view.random_free_cell()
+
+        counts = self._occupancy().astype(np.int64)
+        for cell in range(self.size * self.size):
+            if self.observations.shots >> cell & 1:
+                counts[cell] = -1
+        best = np.flatnonzero(counts == counts.max())
+        cell = int(self.rng.choice(best))
+        return cell % self.size, cell // self.size
+
+    def observe_result(self, position, hit, ship_sunk):
+
+        sunk_mask = self.observations.record(position, hit, ship_sunk)
+        if sunk_mask:
+            kept = []
+            for layout in self.samples:
+                if sunk_mask in layout:
+                    layout = list(layout)
+                    layout.remove(sunk_mask)
+                    kept.append(tuple(layout))
+            self.samples = kept
+
+        self.samples = [layout for layout in self.samples if self._consistent(layout)]
+
+
+class MonteCarloPlayer(Player):
+    """Ordinateur qui joue avec MonteCarloStrategy."""
+
+    def __init__(self, name, is_computer=True, size=10, fleet=None, rng=None, endgame=False,
+                 **options):
+        super().__init__(name, is_computer, size=size, fleet=fleet,
+                         strategy=MonteCarloStrategy(size, fleet, **options), endgame=endgame,
+                         rng=rng)
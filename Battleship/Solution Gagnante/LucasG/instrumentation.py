@@ -0,0 +1,77 @@
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+PHASES = ["decision", "mise_a_jour", "affichage", "saisie", "pause", "tour"]
+
+
+class PhaseStats:
+    """Compteur, total et histogramme (puissances de 2 en ns) d'une phase."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * 64
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.buckets[min(elapsed_ns.bit_length(), 63)] += 1
+
+    def percentile(self, q):
+        """Borne supérieure du seau qui contient le percentile q."""
+        target = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        return {"count": self.count, "total_ns": self.total_ns, "max_ns": self.max_ns,
+                "buckets": {str(1 << i): n for i, n in enumerate(self.buckets) if n}}
+
+
+class TurnProfiler:
+    """Temps passé par phase de tour: décision, mise à jour des grilles, affichage,
+    attente de saisie, pause et tour complet.
+
+    Game l'utilise par `with profiler.measure("decision"):`; un profiler
+    désactivé renvoie un contexte vide partagé.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {phase: PhaseStats() for phase in PHASES}
+        self._null = nullcontext()
+
+    def measure(self, phase):
+        if not self.enabled:
+            return self._null
+        return self._measure(phase)
+
+    @contextmanager
+    def _measure(self, phase):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases[phase].add(time.perf_counter_ns() - start)
+
+    def report(self):
+        lines = [f"{'phase':<12} {'n':>6} {'moyenne':>11} {'p50<=':>11} {'p99<=':>11} {'max':>11}"]
+        for phase, stats in self.phases.items():
+            if not stats.count:
+                continue
+            lines.append(f"{phase:<12} {stats.count:>6} {stats.total_ns / stats.count / 1e6:>9.3f}ms "
+                         f"{stats.percentile(0.5) / 1e6:>9.3f}ms {stats.percentile(0.99) / 1e6:>9.3f}ms "
+                         f"{stats.max_ns / 1e6:>9.3f}ms")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({phase: stats.to_dict() for phase, stats in self.phases.items()}, file, indent=2)
@@ -0,0 +1,107 @@
+
+import random
+
+import numpy as np
+
+from bataille_navale import FLEET
+from flotte import fleet_sampler
+from placements import placement_table
+from strategies import BatchStrategy
+
+
+class BatchBoards:
+    """N grilles de bataille navale tenues dans des tableaux NumPy.
+
+    ship_id[g, y, x] vaut l'indice du navire (dans l'ordre de la flotte) qui
+    occupe la case, ou -1; shots[g, y, x] indique les cases déjà visées. shoot
+    applique un tir à chaque grille en un seul appel, avec la même règle que
+    Board.shoot.
+    """
+
+    def __init__(self, ship_id, fleet=None):
+        fleet = fleet or FLEET
+        self.names = [name for name, _ in fleet]
+        self.lengths = np.array([size for _, size in fleet], dtype=np.int16)
+        self.ship_id = ship_id
+        self.n_games, self.size, _ = ship_id.shape
+        self.shots = np.zeros(ship_id.shape, dtype=bool)
+        self.remaining = np.tile(self.lengths, (self.n_games, 1))
+        self.afloat = np.full(self.n_games, len(fleet), dtype=np.int16)
+        self._games = np.arange(self.n_games)
+
+    @classmethod
+    def random(cls, n_games, size=10, fleet=None, rng=None):
+        """n_games grilles dont les flottes sont tirées uniformément.
+
+        `rng` est le générateur des tirages (le module random par défaut).
+        """
+        rng = rng or random
+        fleet = fleet or FLEET
+        lengths = tuple(length for _, length in fleet)
+        sampler = fleet_sampler(size, lengths)
+        cells = [np.array([placement.cells for placement in placement_table(size, length).placements])
+                 for length in lengths]
+
+        drawn = [sampler.sample_indices(rng) for _ in range(n_games)]
+        if None in drawn:
+            raise ValueError(f"La flotte ne tient pas sur une grille de {size} cases")
+        indices = np.array(drawn, dtype=np.intp).reshape(n_games, len(lengths))
+        ship_id = np.full((n_games, size * size), -1, dtype=np.int8)
+        games = np.arange(n_games)[:, None]
+        for ship, ship_cells in enumerate(cells):
+            ship_id[games, ship_cells[indices[:, ship]]] = ship
+        return cls(ship_id.reshape(n_games, size, size), fleet)
+
+    def shoot(self, xs, ys):
+        """Tire en (xs[g], ys[g]) sur chaque grille g.
+
+        Renvoie deux tableaux: hit (touché ou non) et sunk (indice du navire
+        coulé par ce tir, -1 sinon). Comme Board.shoot, viser une case déjà
+        visée ne change rien; ce tir est compté à l'eau.
+        """
+        games = self._games
+        repeated = self.shots[games, ys, xs]
+        self.shots[games, ys, xs] = True
+
+        ship = self.ship_id[games, ys, xs].astype(np.intp)
+        hit = (ship >= 0) & ~repeated
+        sunk = np.full(self.n_games, -1, dtype=np.intp)
+
+        hit_games = games[hit]
+        hit_ships = ship[hit]
+        self.remaining[hit_games, hit_ships] -= 1
+        just_sunk = self.remaining[hit_games, hit_ships] == 0
+        sunk[hit_games[just_sunk]] = hit_ships[just_sunk]
+        self.afloat[hit_games[just_sunk]] -= 1
+        return hit, sunk
+
+    def all_ships_sunk(self):
+        """Tableau booléen: toute la flotte de la grille g est coulée."""
+        return self.afloat == 0
+
+
+class RandomBatchStrategy(BatchStrategy):
+    """Tir au hasard sur une case jamais visée, pour toutes les parties à la fois."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def choose_shots(self, boards):
+        noise = self.rng.random((boards.n_games, boards.size * boards.size))
+        noise[boards.shots.reshape(boards.n_games, -1)] = -1.0
+        cells = noise.argmax(axis=1)
+        return cells % boards.size, cells // boards.size
+
+
+def play_batch(boards, strategy):
+    """Joue toutes les parties du lot jusqu'au bout; renvoie le nombre de tirs de chacune."""
+    shots = np.zeros(boards.n_games, dtype=np.int32)
+    done = boards.all_ships_sunk()
+    while not done.all():
+        xs, ys = strategy.choose_shots(boards)
+        hit, sunk = boards.shoot(xs, ys)
+        strategy.observe_results(xs, ys, hit, sunk)
+        shots += ~done
+        done = boards.all_ships_sunk()
+    return shots
+
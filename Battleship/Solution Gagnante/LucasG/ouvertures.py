@@ -0,0 +1,160 @@
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import time
+from functools import lru_cache
+
+from bataille_navale import FLEET
+from comptage_exact import exact_counts
+from placements import neighbour_masks
+
+MAGIC = b"BNOB"
+VERSION = 2
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ouvertures.bnob")
+
+# Magie, version, taille de grille, nombre d'entrées.
+_HEADER = struct.Struct("<4sBHI")
+# Clé de la position, case à viser.
+_ENTRY = struct.Struct("<QH")
+
+
+def book_key(size, lengths, empty, full):
+    """Empreinte 64 bits d'une position: navires à flot, cases vides, touches en cours."""
+    n_bytes = (size * size + 7) // 8
+    data = (struct.pack("<HB", size, len(lengths)) + bytes(sorted(lengths))
+            + empty.to_bytes(n_bytes, "little") + full.to_bytes(n_bytes, "little"))
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class OpeningBook:
+    """Livre d'ouvertures: la meilleure case à viser pour les premières positions.
+
+    Le fichier contient des entrées (clé, case) triées par clé. Il n'est ouvert
+    et projeté en mémoire qu'à la première recherche; les processus qui lisent
+    le même livre en partagent les pages. Un livre absent ne trouve rien.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._map = None
+        self._count = 0
+        self._opened = False
+
+    def _open(self):
+        self._opened = True
+        try:
+            with open(self.path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        magic, version, _, count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            data.close()
+            raise ValueError(f"Livre d'ouvertures invalide: {self.path}")
+        self._map = data
+        self._count = count
+
+    def lookup(self, size, lengths, empty, full):
+        """Case (y * size + x) conseillée pour cette position, ou None."""
+        if not self._opened:
+            self._open()
+        if self._map is None:
+            return None
+        key = book_key(size, lengths, empty, full)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            found, cell = _ENTRY.unpack_from(self._map, _HEADER.size + middle * _ENTRY.size)
+            if found == key:
+                return cell
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+@lru_cache(maxsize=None)
+def opening_book(path=DEFAULT_PATH):
+    """Livre partagé par les joueurs d'un même processus."""
+    return OpeningBook(path)
+
+
+def _best_cell(size, lengths, empty, full):
+    total, counts = exact_counts(size, lengths, empty, full)
+    if not total:
+        return None
+    known = empty | full
+    return max((cell for cell in range(size * size) if not known >> cell & 1),
+               key=lambda cell: counts[cell], default=None)
+
+
+def _answers(size, lengths, empty, full, cell):
+    """Positions qui suivent un tir en `cell`: à l'eau, touché, ou coulé."""
+    bit = 1 << cell
+    yield lengths, empty | bit, full
+    yield lengths, empty, full | bit
+
+    # Coulé: la touche complète une ligne de touches de la longueur d'un navire.
+    x, y = cell % size, cell // size
+    neighbours = neighbour_masks(size)
+    ships = set()
+    for dx, dy in ((1, 0), (0, 1)):
+        ship = [cell]
+        for sign in (1, -1):
+            nx, ny = x + sign * dx, y + sign * dy
+            while 0 <= nx < size and 0 <= ny < size and full >> (ny * size + nx) & 1:
+                ship.append(ny * size + nx)
+                nx, ny = nx + sign * dx, ny + sign * dy
+        if len(ship) in lengths:
+            ships.add(tuple(sorted(ship)))
+    for ship in ships:
+        rest = list(lengths)
+        rest.remove(len(ship))
+        mask = halo = 0
+        for part in ship:
+            mask |= 1 << part
+            halo |= neighbours[part]
+        # Comme ExactStrategy: le navire coulé et ses voisines deviennent vides.
+        yield tuple(rest), empty | halo, full & ~mask
+
+
+def build_book(path=DEFAULT_PATH, size=10, fleet=None, depth=4, progress=None):
+    """Calcule hors ligne les `depth` premiers coups de ExactStrategy pour toutes
+    les réponses possibles, et écrit le livre dans `path`."""
+    lengths = tuple(sorted(length for _, length in (fleet or FLEET)))
+    entries = {}
+    positions = {(lengths, 0, 0)}
+    for level in range(depth):
+        following = set()
+        for remaining, empty, full in positions:
+            cell = _best_cell(size, remaining, empty, full)
+            if cell is None:
+                continue
+            entries[book_key(size, remaining, empty, full)] = cell
+            following.update(_answers(size, remaining, empty, full, cell))
+        if progress:
+            progress(level + 1, len(entries))
+        positions = following
+
+    data = bytearray(_HEADER.pack(MAGIC, VERSION, size, len(entries)))
+    for key in sorted(entries):
+        data += _ENTRY.pack(key, entries[key])
+    with open(path, "wb") as file:
+        file.write(data)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le livre d'ouvertures de l'IA exacte.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--profondeur", type=int, default=4, help="nombre de coups couverts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_book(args.path, depth=args.profondeur,
+                       progress=lambda level, n: print(f"coup {level}: {n} positions"))
+    print(f"{count} positions écrites dans {args.path} en {time.perf_counter() - start:.1f} s")
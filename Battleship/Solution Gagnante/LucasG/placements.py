@@ -0,0 +1,105 @@
+
+import random
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def neighbour_masks(size):
+    """Masque de chaque case et de ses 8 voisines, indexé par y * size + x."""
+    masks = []
+    for y in range(size):
+        for x in range(size):
+            mask = 0
+            for dx in [-1, 0, 1]:
+                for dy in [-1, 0, 1]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < size and 0 <= ny < size:
+                        mask |= 1 << (ny * size + nx)
+            masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def halo_masks(size, touching=False):
+    """Cases interdites par un navire sur chaque case: la case et ses voisines,
+    ou la case seule si les navires peuvent se toucher."""
+    if touching:
+        return tuple(1 << cell for cell in range(size * size))
+    return neighbour_masks(size)
+
+
+class Placement:
+    """Un placement légal: ses cases, son masque et son halo (cases interdites aux autres navires)."""
+
+    def __init__(self, index, positions, size, neighbours):
+        self.index = index
+        self.positions = positions
+        self.cells = tuple(y * size + x for x, y in positions)
+        self.mask = 0
+        self.halo = 0
+        for cell in self.cells:
+            self.mask |= 1 << cell
+            self.halo |= neighbours[cell]
+
+
+class PlacementTable:
+    """Tous les placements d'un navire de longueur `length` sur une grille `size` x `size`.
+
+    Les placements horizontaux viennent d'abord, puis les verticaux, chacun
+    dans l'ordre des lignes; un navire de longueur 1 n'est compté qu'une fois.
+    Si `touching` est vrai, le halo d'un placement se réduit à ses cases.
+    """
+
+    def __init__(self, size, length, touching=False):
+        self.size = size
+        self.length = length
+        self.touching = touching
+        neighbours = halo_masks(size, touching)
+
+        lines = []
+        for y in range(size):
+            for x in range(size - length + 1):
+                lines.append(tuple((x + i, y) for i in range(length)))
+        if length > 1:
+            for y in range(size - length + 1):
+                for x in range(size):
+                    lines.append(tuple((x, y + i) for i in range(length)))
+
+        self.placements = [Placement(i, positions, size, neighbours)
+                           for i, positions in enumerate(lines)]
+        self.masks = [placement.mask for placement in self.placements]
+        self.halos = [placement.halo for placement in self.placements]
+        self.index = {placement.positions: placement.index for placement in self.placements}
+        self.by_cell = [[] for _ in range(size * size)]
+        for placement in self.placements:
+            for cell in placement.cells:
+                self.by_cell[cell].append(placement.index)
+
+    def __len__(self):
+        return len(self.placements)
+
+    def find(self, positions):
+        """Placement correspondant à `positions`, dans n'importe quel ordre, ou None
+        s'il n'est pas légal."""
+        index = self.index.get(tuple(sorted(positions)))
+        return None if index is None else self.placements[index]
+
+    def compatible(self, forbidden):
+        """Indices des placements qui n'empiètent pas sur le masque `forbidden`."""
+        return [i for i, mask in enumerate(self.masks) if not mask & forbidden]
+
+    def random_placement(self, forbidden=0, rng=random):
+        """Placement tiré uniformément parmi ceux compatibles, ou None.
+
+        `rng` est le générateur du tirage (un random.Random ou le module random).
+        """
+        candidates = self.compatible(forbidden)
+        if not candidates:
+            return None
+        return self.placements[rng.choice(candidates)]
+
+
+@lru_cache(maxsize=None)
+def placement_table(size, length, touching=False):
+    """Table partagée par les grilles, les IA et la mise en place des flottes."""
+    return PlacementTable(size, length, touching)
@@ -0,0 +1,167 @@
+
+import random
+
+from bataille_navale import Board, FreeCells
+from regles import rule_set
+
+
+class BitBoard:
+    """Grille équivalente à Board, dont l'état tient dans des entiers (un bit par case).
+
+    Les navires, les tirs et les touches sont des masques; le bit de la case
+    (x, y) est 1 << (y * size + x). Destinée aux simulations, elle offre la même
+    interface que Board, pour la grille d'un joueur comme pour la vue de la
+    grille adverse; les cases jamais visées ne sont construites, comme pour
+    Board, qu'au premier appel de random_free_cell.
+    """
+
+    __slots__ = ("size", "rng", "rules", "ships", "ship_masks", "ships_mask", "forbidden",
+                 "shots_mask", "hits_mask", "free")
+
+    def __init__(self, size=10, rng=None, rules=None):
+        self.size = size
+        self.rng = rng or random
+        self.rules = rules or rule_set(size)
+        self.ships = []
+        self.ship_masks = []
+        self.ships_mask = 0
+        self.forbidden = 0
+        self.shots_mask = 0
+        self.hits_mask = 0
+        self.free = None
+
+    def _mask(self, positions):
+        mask = 0
+        for x, y in positions:
+            mask |= 1 << (y * self.size + x)
+        return mask
+
+    def _halo(self, positions):
+        placement = self.rules.table(len(positions)).find(positions)
+        if placement is not None:
+            return placement.halo
+        halo = 0
+        halos = self.rules.halos()
+        for x, y in positions:
+            halo |= halos[y * self.size + x]
+        return halo
+
+    @property
+    def shots(self):
+        """Ensemble des positions déjà visées."""
+        return {(i % self.size, i // self.size) for i in range(self.size * self.size)
+                if self.shots_mask >> i & 1}
+
+    def is_shot(self, position):
+        x, y = position
+        return bool(self.shots_mask >> (y * self.size + x) & 1)
+
+    def add_ship(self, ship):
+        mask = self._mask(ship.positions)
+        self.ships.append(ship)
+        self.ship_masks.append(mask)
+        self.ships_mask |= mask
+        self.forbidden |= self._halo(ship.positions)
+
+    def can_place_ship(self, positions):
+        # Le halo des navires déjà placés couvre leurs cases et leurs voisines.
+        placement = self.rules.table(len(positions)).find(positions)
+        return placement is not None and not placement.mask & self.forbidden
+
+    def place_ship_randomly(self, ship):
+        placement = self.rules.table(ship.size).random_placement(self.forbidden, self.rng)
+        if placement is None:
+            return False
+
+        ship.place(list(placement.positions))
+        self.add_ship(ship)
+        return True
+
+    def place_all_ships_randomly(self, ships):
+
+        if not self.ships:
+            placements = self.rules.sampler(ship.size for ship in ships).sample(self.rng)
+            if placements is None:
+                return False
+        else:
+            placements = []
+            forbidden = self.forbidden
+            for ship in ships:
+                placement = self.rules.table(ship.size).random_placement(forbidden, self.rng)
+                if placement is None:
+                    return False
+                placements.append(placement)
+                forbidden |= placement.halo
+
+        for ship, placement in zip(ships, placements):
+            ship.place(list(placement.positions))
+            self.add_ship(ship)
+        return True
+
+    def shoot(self, position):
+
+        x, y = position
+        bit = 1 << (y * self.size + x)
+
+        if self.shots_mask & bit:
+            return None, None
+
+        self.mark_shot(position)
+
+        if not self.ships_mask & bit:
+            return False, None
+
+        self.hits_mask |= bit
+        for ship, mask in zip(self.ships, self.ship_masks):
+            if mask & bit:
+                ship.is_hit(position)
+                if mask & self.hits_mask == mask:
+                    return True, ship
+                return True, None
+
+    def mark_shot(self, position):
+        """Note un tir en `position` et la retire des cases libres."""
+        x, y = position
+        cell = y * self.size + x
+        bit = 1 << cell
+        if self.shots_mask & bit:
+            return
+        self.shots_mask |= bit
+        if self.free is not None:
+            self.free.remove(cell)
+
+    def random_free_cell(self):
+        """Case jamais visée tirée au hasard."""
+        if self.free is None:
+            size = self.size
+            self.free = FreeCells(size, (i for i in range(size * size)
+                                         if not self.shots_mask >> i & 1))
+        return self.free.choice(self.rng)
+
+    def record_result(self, position, hit):
+        """Note sur la grille adverse le résultat d'un de nos tirs."""
+        self.mark_shot(position)
+        if hit:
+            x, y = position
+            self.hits_mask |= 1 << (y * self.size + x)
+
+    def all_ships_sunk(self):
+
+        return self.hits_mask == self.ships_mask
+
+    def display(self, hide_ships=False):
+
+        board = Board(self.size)
+        for i in range(self.size * self.size):
+            bit = 1 << i
+            if self.hits_mask & bit:
+                cell = 'X'
+            elif self.shots_mask & bit:
+                cell = '-'
+            elif self.ships_mask & bit and not hide_ships:
+                cell = 'O'
+            else:
+                continue
+            board.cells[i] = ord(cell)
+
+        return board.display()
@@ -0,0 +1,99 @@
+
+from functools import lru_cache
+
+from flotte import fleet_sampler
+from placements import halo_masks, placement_table
+
+
+class RuleSet:
+    """Règles d'une partie: taille de la grille, flotte, et contact entre navires.
+
+    Par défaut deux navires ne peuvent pas se toucher, même en diagonale; avec
+    touching=True ils peuvent se toucher mais pas se chevaucher. Les règles
+    sont compilées une fois en masques partagés: tables de placements de
+    chaque longueur, halo de chaque case et échantillonneur de la flotte. Les
+    grilles placent et valident les navires avec ces masques sans revérifier
+    les règles case par case. Les tables ne sont calculées qu'à la première
+    utilisation, ce qui laisse les très grandes grilles (grand_plateau.py)
+    s'en passer.
+    """
+
+    def __init__(self, size=10, fleet=(), touching=False):
+        self.size = size
+        self.fleet = tuple((name, length) for name, length in fleet)
+        self.touching = touching
+        self._feasible = None
+        for name, length in self.fleet:
+            if not 1 <= length <= size:
+                raise ValueError(f"Le {name} ({length} cases) ne tient pas sur une grille de {size} cases")
+
+    @property
+    def lengths(self):
+        return tuple(length for _, length in self.fleet)
+
+    def table(self, length):
+        """Placements d'un navire de longueur `length` selon ces règles."""
+        return placement_table(self.size, length, self.touching)
+
+    def halos(self):
+        """Pour chaque case, les cases interdites par un navire qui l'occupe."""
+        return halo_masks(self.size, self.touching)
+
+    def sampler(self, lengths=None):
+        """Échantillonneur de flottes de longueurs `lengths` (la flotte des règles par défaut)."""
+        return fleet_sampler(self.size, tuple(self.lengths if lengths is None else lengths),
+                             self.touching)
+
+    def feasible(self):
+        """Vrai si la flotte peut être placée sur la grille; calculé une seule fois.
+
+        Deux tests immédiats tranchent presque toujours: la surface (chaque navire
+        et son halo à droite et en dessous occupent 2 * (longueur + 1) cases d'une
+        grille agrandie d'une ligne et d'une colonne) et un rangement glouton des
+        navires en lignes. Sinon l'échantillonneur de la flotte cherche une
+        disposition, ce qui construit ses tables: les très grandes grilles n'en
+        ont pas besoin.
+        """
+        if self._feasible is None:
+            if self._too_large():
+                self._feasible = False
+            elif self._packs_in_rows():
+                self._feasible = True
+            else:
+                self._feasible = self.sampler().feasible
+        return self._feasible
+
+    def _too_large(self):
+        if self.touching:
+            return sum(self.lengths) > self.size * self.size
+        return sum(2 * (length + 1) for length in self.lengths) > (self.size + 1) ** 2
+
+    def _packs_in_rows(self):
+        """Vrai si les navires tiennent, rangés bout à bout, dans une ligne sur deux
+        (sur chaque ligne si les navires peuvent se toucher)."""
+        gap = 0 if self.touching else 1
+        free = [self.size + gap] * len(range(0, self.size, 1 + gap))
+        for length in sorted(self.lengths, reverse=True):
+            for row, room in enumerate(free):
+                if room >= length + gap:
+                    free[row] -= length + gap
+                    break
+            else:
+                return False
+        return True
+
+    def __eq__(self, other):
+        return (isinstance(other, RuleSet) and
+                (self.size, self.fleet, self.touching) == (other.size, other.fleet, other.touching))
+
+    def __hash__(self):
+        return hash((self.size, self.fleet, self.touching))
+
+    def __repr__(self):
+        return f"RuleSet(size={self.size}, fleet={list(self.fleet)!r}, touching={self.touching})"
+
+
+@lru_cache(maxsize=None)
+def rule_set(size=10, fleet=(), touching=False):
+    """Règles partagées par les grilles et les joueurs; `fleet` est un tuple de (nom, longueur)."""
+    return RuleSet(size, fleet, touching)
@@ -0,0 +1,97 @@
+
+import os
+import shutil
+import sys
+
+
+class FrameRenderer:
+    """Affiche une image texte en ne réécrivant que les caractères qui ont changé.
+
+    L'image précédente est conservée; chaque appel à draw compare ligne par
+    ligne, place le curseur sur chaque segment modifié avec une séquence ANSI
+    et envoie le tout en une seule écriture. L'image est dessinée sur l'écran
+    alternatif du terminal et le texte affiché sous l'image (messages,
+    saisies) défile dans une zone qui lui est réservée: l'image ne bouge donc
+    jamais et est effacée de ses messages au tour suivant. Si le terminal est
+    trop petit pour l'image et prompt_rows lignes de messages, chaque draw
+    redessine tout. close rend au terminal son écran normal.
+    """
+
+    def __init__(self, stream=None, prompt_rows=6):
+        self.stream = stream or sys.stdout
+        self.prompt_rows = prompt_rows
+        self.previous = None
+        self.last = None
+        self.alternate = False
+        if os.name == 'nt':
+            # Active l'interprétation des séquences ANSI dans la console Windows.
+            os.system('')
+
+    def reset(self):
+        """Force un affichage complet au prochain draw (écran effacé entre-temps)."""
+        self.previous = None
+
+    def draw(self, lines):
+        out = []
+        if not self.alternate:
+            out.append('\x1b[?1049h')
+            self.alternate = True
+        rows = shutil.get_terminal_size().lines
+        fits = len(lines) + self.prompt_rows <= rows
+
+        if self.previous is None or not fits:
+            out.append('\x1b[r\x1b[H\x1b[2J')
+            out.append('\n'.join(lines))
+        else:
+            for row, line in enumerate(lines):
+                old = self.previous[row] if row < len(self.previous) else ''
+                if line != old:
+                    out.extend(self._diff_line(row, old, line))
+            for row in range(len(lines), len(self.previous)):
+                out.append(f'\x1b[{row + 1};1H\x1b[K')
+
+        if fits:
+            # Les messages défilent sous l'image; on efface ceux du tour précédent.
+            out.append(f'\x1b[{len(lines) + 1};{rows}r')
+            out.append(f'\x1b[{len(lines) + 1};1H\x1b[J')
+            self.previous = list(lines)
+        else:
+            # L'image peut défiler: le prochain draw repart d'un écran vide.
+            out.append('\n')
+            self.previous = None
+        self.last = list(lines)
+        self.stream.write(''.join(out))
+        self.stream.flush()
+
+    def close(self, lines=None):
+        """Quitte l'écran alternatif et réaffiche `lines` (la dernière image par défaut)."""
+        if not self.alternate:
+            return
+        lines = lines if lines is not None else self.last
+        self.stream.write('\x1b[r\x1b[?1049l' + ('\n'.join(lines) + '\n' if lines else ''))
+        self.stream.flush()
+        self.alternate = False
+        self.previous = None
+
+    @staticmethod
+    def _diff_line(row, old, new):
+        out = []
+        col = 0
+        common = min(len(old), len(new))
+        while col < common:
+            if old[col] == new[col]:
+                col += 1
+                continue
+            # Quelques caractères identiques coûtent moins qu'un nouveau déplacement.
+            start = end = col
+            while col < common and col - end < 8:
+                if old[col] != new[col]:
+                    end = col + 1
+                col += 1
+            out.append(f'\x1b[{row + 1};{start + 1}H{new[start:end]}')
+            col = end
+        if len(new) > common:
+            out.append(f'\x1b[{row + 1};{common + 1}H{new[common:]}')
+        elif len(old) > common:
+            out.append(f'\x1b[{row + 1};{common + 1}H\x1b[K')
+        return out
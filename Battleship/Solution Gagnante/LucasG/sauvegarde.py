@@ -0,0 +1,155 @@
+
+import random
+import struct
+import sys
+from sys import byteorder
+
+from bataille_navale import FLEET, Board, Game, Ship, _cell_array
+from grand_plateau import SparseBoard
+from regles import rule_set
+
+MAGIC = b"BNSV"
+VERSION = 2
+
+# Magie, version, taille de grille, joueur courant, type de grille, nombre de tirs.
+_HEADER = struct.Struct("<4sBHBBI")
+_SHIP = struct.Struct("<BH")
+_PLACEMENT = struct.Struct("<IB")
+
+BOARD_KINDS = [Board, SparseBoard]
+
+
+def snapshot_game(game):
+    """Instantané binaire d'une Game en cours.
+
+    Il contient la flotte (noms et tailles) et la règle de contact, la position
+    de chaque navire des deux joueurs, le joueur courant et l'historique des
+    tirs, l'humain tirant en premier. Les tirs reçus, les touches de chaque
+    navire et la vue de la grille adverse s'en déduisent à la restauration.
+    """
+    human, computer = game.human_player, game.computer_player
+    size = human.board.size
+    fleet = [(ship.name, ship.size) for ship in human.board.ships]
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, size,
+                                 0 if game.current_player is human else 1,
+                                 BOARD_KINDS.index(type(human.board)), len(game.history)))
+    out.append(human.rules.touching)
+    out.append(len(fleet))
+    for name, ship_size in fleet:
+        encoded = name.encode("utf-8")
+        out += _SHIP.pack(len(encoded), ship_size)
+        out += encoded
+
+    for player in (human, computer):
+        for ship in player.board.ships:
+            # Les positions peuvent être dans n'importe quel ordre (voir Board.add_ship).
+            x, y = min(ship.positions)
+            vertical = len(ship.positions) > 1 and all(px == x for px, _ in ship.positions)
+            out += _PLACEMENT.pack(y * size + x, vertical)
+
+    cells = _cell_array(size)
+    cells.extend(y * size + x for x, y in game.history)
+    if byteorder == "big":
+        cells.byteswap()
+    out += cells.tobytes()
+    return bytes(out)
+
+
+def restore_game(data):
+    """Recrée une Game à partir d'un instantané de snapshot_game."""
+    magic, version, size, current, kind, n_shots = _HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError("Instantané de partie invalide")
+    offset = _HEADER.size
+
+    # La version 1 ne connaissait que la règle de non-contact.
+    touching = False
+    if version >= 2:
+        touching = bool(data[offset])
+        offset += 1
+    n_ships = data[offset]
+    offset += 1
+    fleet = []
+    for _ in range(n_ships):
+        name_length, ship_size = _SHIP.unpack_from(data, offset)
+        offset += _SHIP.size
+        fleet.append((data[offset:offset + name_length].decode("utf-8"), ship_size))
+        offset += name_length
+
+    game = Game(size, BOARD_KINDS[kind], rules=rule_set(size, tuple(fleet), touching))
+    players = (game.human_player, game.computer_player)
+    for player in players:
+        for name, ship_size in fleet:
+            start, vertical = _PLACEMENT.unpack_from(data, offset)
+            offset += _PLACEMENT.size
+            x, y = start % size, start // size
+            ship = Ship(name, ship_size)
+            if vertical:
+                ship.place([(x, y + i) for i in range(ship_size)])
+            else:
+                ship.place([(x + i, y) for i in range(ship_size)])
+            player.board.add_ship(ship)
+
+    cells = _cell_array(size)
+    cells.frombytes(data[offset:offset + n_shots * cells.itemsize])
+    if byteorder == "big":
+        cells.byteswap()
+
+    # On rejoue les tirs: chaque grille retrouve ses touches et sa case libre.
+    for turn, cell in enumerate(cells):
+        shooter, target = players[turn % 2], players[1 - turn % 2]
+        position = (cell % size, cell // size)
+        hit, ship_sunk = target.board.shoot(position)
+        shooter.receive_shot_result(position, hit, ship_sunk)
+        game.history.append(position)
+
+    game.current_player = players[current]
+    return game
+
+
+def verify(games=50, seed=0):
+    """Vérifie que restore_game(snapshot_game(partie)) redonne la même partie, y
+    compris pour des navires dont les positions ont été données dans le désordre."""
+    rng = random.Random(seed)
+    failures = 0
+    for index in range(games):
+        game = Game(rules=rule_set(10, tuple(FLEET), touching=index % 2 == 1))
+        for player in (game.human_player, game.computer_player):
+            player.set_rng(random.Random(rng.getrandbits(32)))
+            ships = [Ship(name, size) for name, size in player.fleet]
+            player.board.place_all_ships_randomly(ships)
+            for ship in ships:
+                positions = list(ship.positions)
+                rng.shuffle(positions)
+                ship.positions = tuple(positions)
+        players = (game.human_player, game.computer_player)
+        for turn in range(rng.randrange(60)):
+            shooter, target = players[turn % 2], players[1 - turn % 2]
+            position = shooter.opponent_board.random_free_cell()
+            hit, ship_sunk = target.board.shoot(position)
+            shooter.receive_shot_result(position, hit, ship_sunk)
+            game.history.append(position)
+        game.current_player = players[len(game.history) % 2]
+
+        try:
+            restored = restore_game(snapshot_game(game))
+        except (IndexError, ValueError) as error:
+            failures += 1
+            print(f"Partie {index} non restaurée: {error!r}")
+            continue
+        for before, after in zip(players, (restored.human_player, restored.computer_player)):
+            if ([sorted(ship.positions) for ship in before.board.ships] !=
+                    [sorted(ship.positions) for ship in after.board.ships] or
+                    before.board.display() != after.board.display() or
+                    before.opponent_board.display() != after.opponent_board.display()):
+                failures += 1
+                print(f"Écart sur la partie {index} ({before.name})")
+    print(f"{games} parties sauvegardées et restaurées, {failures} écart(s)")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    # --verifier sauvegarde puis restaure des parties au hasard et les compare.
+    if "--verifier" in sys.argv:
+        sys.exit(0 if verify() else 1)
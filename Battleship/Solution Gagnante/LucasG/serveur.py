@@ -0,0 +1,236 @@
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from bataille_navale import Player, column_label, parse_position, position_label
+
+# Protocole ligne par ligne (UTF-8), une commande par ligne:
+#   NOUVELLE        nouvelle partie contre l'ordinateur     -> PRET
+#   TIR A5          tire en A5 -> TOUCHE A5 | EAU A5 | COULE A5 <navire>,
+#                   puis ADVERSAIRE <résultat du tir de l'ordinateur>, puis
+#                   A_VOUS, ou VICTOIRE / DEFAITE en fin de partie
+#   GRILLE          les deux grilles, terminées par FIN
+#   STATS           parties en cours et latence des tirs
+#   QUITTER         ferme la connexion
+# Une commande invalide reçoit ERREUR <message>.
+
+# File d'attente des connexions: des milliers de clients peuvent arriver d'un coup.
+BACKLOG = 4096
+
+
+class Match:
+    """Partie entre un client (flotte placée au hasard) et l'ordinateur."""
+
+    def __init__(self):
+        self.client = Player("Client", is_computer=True)
+        self.computer = Player("Serveur", is_computer=True)
+        for player in (self.client, self.computer):
+            if not player.setup_ships():
+                raise ValueError(f"La flotte de {player.name} ne tient pas sur la grille")
+        self.over = False
+
+    @staticmethod
+    def _outcome(position, hit, ship_sunk):
+        if ship_sunk:
+            return f"COULE {position_label(position)} {ship_sunk.name}"
+        return f"{'TOUCHE' if hit else 'EAU'} {position_label(position)}"
+
+    def fire(self, position):
+        """Joue le tir du client puis celui de l'ordinateur; renvoie les lignes de réponse."""
+        hit, ship_sunk = self.computer.board.shoot(position)
+        self.client.receive_shot_result(position, hit, ship_sunk)
+        lines = [self._outcome(position, hit, ship_sunk)]
+        if self.computer.board.all_ships_sunk():
+            self.over = True
+            return lines + ["VICTOIRE"]
+
+        reply = self.computer.get_shot()
+        hit, ship_sunk = self.client.board.shoot(reply)
+        self.computer.receive_shot_result(reply, hit, ship_sunk)
+        lines.append(f"ADVERSAIRE {self._outcome(reply, hit, ship_sunk)}")
+        if self.client.board.all_ships_sunk():
+            self.over = True
+            return lines + ["DEFAITE"]
+        return lines + ["A_VOUS"]
+
+
+class ServerStats:
+    """Compteurs du serveur; les latences récentes servent aux percentiles."""
+
+    def __init__(self, window=100000):
+        self.active_matches = 0
+        self.finished_matches = 0
+        self.moves = 0
+        self.latencies = deque(maxlen=window)
+
+    def percentile(self, q):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        return (f"parties={self.active_matches} terminees={self.finished_matches} "
+                f"tirs={self.moves} p50={self.percentile(0.5) * 1e6:.0f}us "
+                f"p99={self.percentile(0.99) * 1e6:.0f}us")
+
+
+class BattleshipServer:
+    """Héberge une partie par connexion TCP ou socket Unix."""
+
+    def __init__(self):
+        self.stats = ServerStats()
+
+    def _fire(self, match, argument):
+        if match is None or match.over:
+            return ["ERREUR aucune partie en cours"]
+        try:
+            position = parse_position(argument)
+        except ValueError:
+            return ["ERREUR position invalide"]
+        size = match.computer.board.size
+        if not (0 <= position[0] < size and 0 <= position[1] < size):
+            return [f"ERREUR utilisez A-{column_label(size - 1)} et 1-{size}"]
+        if match.client.opponent_board.is_shot(position):
+            return ["ERREUR case deja visee"]
+
+        start = time.perf_counter()
+        lines = match.fire(position)
+        self.stats.latencies.append(time.perf_counter() - start)
+        self.stats.moves += 1
+        if match.over:
+            self.stats.active_matches -= 1
+            self.stats.finished_matches += 1
+        return lines
+
+    async def handle(self, reader, writer):
+        match = None
+        writer.write(b"BIENVENUE\n")
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Ligne au-delà de la limite du lecteur (64 Kio): on répond et on coupe.
+                    writer.write(b"ERREUR ligne trop longue\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                command, _, argument = line.decode("utf-8", "replace").strip().partition(" ")
+                command = command.upper()
+
+                if command == "NOUVELLE":
+                    if match is not None and not match.over:
+                        self.stats.active_matches -= 1
+                    match = Match()
+                    self.stats.active_matches += 1
+                    lines = ["PRET"]
+                elif command == "TIR":
+                    lines = self._fire(match, argument.strip().upper())
+                elif command == "GRILLE" and match is None:
+                    lines = ["ERREUR aucune partie en cours"]
+                elif command == "GRILLE":
+                    lines = (match.client.opponent_board.display().split("\n") + [""]
+                             + match.client.board.display().split("\n") + ["FIN"])
+                elif command == "STATS":
+                    lines = [self.stats.summary()]
+                elif command == "QUITTER":
+                    break
+                else:
+                    lines = ["ERREUR commande inconnue"]
+
+                writer.write(("\n".join(lines) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if match is not None and not match.over:
+                self.stats.active_matches -= 1
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path=path, backlog=BACKLOG)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, backlog=BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+
+async def _bot(host, port, ready, go, latencies):
+    """Client automatique: tire au hasard jusqu'à la fin de la partie."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()
+    writer.write(b"NOUVELLE\n")
+    await reader.readline()
+    ready.release()
+    await go.wait()
+
+    cells = [(x, y) for y in range(10) for x in range(10)]
+    random.shuffle(cells)
+    status = b""
+    for position in cells:
+        start = time.perf_counter()
+        writer.write(f"TIR {position_label(position)}\n".encode())
+        status = await reader.readline()
+        while status.rstrip() not in (b"A_VOUS", b"VICTOIRE", b"DEFAITE"):
+            status = await reader.readline()
+        latencies.append(time.perf_counter() - start)
+        if status.rstrip() != b"A_VOUS":
+            break
+    writer.write(b"QUITTER\n")
+    await writer.drain()
+    writer.close()
+
+
+async def run_load_test(n_matches, host="127.0.0.1", port=8766):
+    """Lance n_matches parties simultanées contre un serveur local et mesure mémoire et latence."""
+    server = BattleshipServer()
+    tracemalloc.start()
+    listener = await asyncio.start_server(server.handle, host, port, backlog=BACKLOG)
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    ready = asyncio.Semaphore(0)
+    go = asyncio.Event()
+    latencies = []
+    bots = [asyncio.create_task(_bot(host, port, ready, go, latencies)) for _ in range(n_matches)]
+    for _ in range(n_matches):
+        await ready.acquire()
+
+    # Toutes les parties sont ouvertes: mémoire par partie, connexions comprises.
+    per_match = (tracemalloc.get_traced_memory()[0] - baseline) / n_matches
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    go.set()
+    await asyncio.gather(*bots)
+    elapsed = time.perf_counter() - start
+    listener.close()
+    await listener.wait_closed()
+
+    latencies.sort()
+    print(f"{n_matches} parties simultanées, {server.stats.moves} tirs en {elapsed:.2f} s")
+    print(f"Mémoire par partie: {per_match / 1024:.1f} Kio")
+    print(f"Serveur: {server.stats.summary()}")
+    print(f"Aller-retour client: p50={latencies[len(latencies) // 2] * 1e3:.2f} ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur de bataille navale.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="chemin d'une socket Unix au lieu de TCP")
+    parser.add_argument("--charge", type=int, metavar="N",
+                        help="test de charge avec N parties simultanées")
+    args = parser.parse_args()
+
+    if args.charge:
+        asyncio.run(run_load_test(args.charge, args.host, args.port))
+    else:
+        asyncio.run(BattleshipServer().serve(args.host, args.port, args.unix))
@@ -0,0 +1,131 @@
+
+import random
+import sys
+import time
+
+from bataille_navale import Player
+from statistiques import GameStats
+
+
+def player_rng(seed, index):
+    """Générateur du joueur `index` dans la partie de graine `seed`."""
+    return random.Random(f"{seed}:{index}")
+
+
+class GameResult:
+    """Résultat d'une partie simulée.
+
+    Pour chaque joueur: shots compte ses tirs, first_hits donne le numéro de
+    son premier tir au but (None s'il n'a rien touché), hit_cells les cases
+    qu'il a touchées; sink_turns[nom][navire] est le tir qui a coulé ce navire
+    du joueur `nom`.
+    """
+
+    def __init__(self, winner, shots, sink_turns, first_hits=None, hit_cells=None):
+        self.winner = winner
+        self.shots = shots
+        self.sink_turns = sink_turns
+        self.first_hits = first_hits if first_hits is not None else {name: None for name in shots}
+        self.hit_cells = hit_cells if hit_cells is not None else {name: [] for name in shots}
+
+    def __repr__(self):
+        return f"GameResult(winner={self.winner!r}, shots={self.shots!r})"
+
+
+class HeadlessGame:
+    """Partie ordinateur contre ordinateur, sans affichage, saisie ni pause.
+
+    Les joueurs tirent à tour de rôle comme dans Game.play; play() renvoie un
+    GameResult au lieu d'imprimer l'issue de la partie. Les tirs sont gardés
+    dans history, le premier joueur tirant en premier.
+
+    Avec une graine, chaque joueur reçoit son propre générateur (voir
+    player_rng): la partie se rejoue à l'identique à partir de sa seule
+    graine, quel que soit le processus qui la joue.
+    """
+
+    def __init__(self, first=None, second=None, board_class=None, seed=None):
+        self.board_class = board_class
+        self.seed = seed
+        self.history = []
+        self.players = [
+            first or Player("Ordinateur 1", is_computer=True),
+            second or Player("Ordinateur 2", is_computer=True),
+        ]
+
+    def setup(self):
+        for player in self.players:
+            if self.board_class:
+                player.board = self.board_class(player.size, rng=player.rng, rules=player.rules)
+            else:
+                player.board = player.new_board()
+            if not player.setup_ships():
+                raise ValueError(f"La flotte de {player.name} ne tient pas sur la grille")
+            player.opponent_board = player.new_board()
+
+    def play(self):
+        if self.seed is not None:
+            for index, player in enumerate(self.players):
+                player.set_rng(player_rng(self.seed, index))
+        self.setup()
+
+        shooter, target = self.players
+        shots = {player.name: 0 for player in self.players}
+        sink_turns = {player.name: {} for player in self.players}
+        first_hits = {player.name: None for player in self.players}
+        hit_cells = {player.name: [] for player in self.players}
+
+        while True:
+            position = shooter.get_shot()
+            hit, ship_sunk = target.board.shoot(position)
+            shooter.receive_shot_result(position, hit, ship_sunk)
+            shots[shooter.name] += 1
+            self.history.append(position)
+
+            if hit:
+                if first_hits[shooter.name] is None:
+                    first_hits[shooter.name] = shots[shooter.name]
+                hit_cells[shooter.name].append(position)
+            if ship_sunk:
+                sink_turns[target.name][ship_sunk.name] = shots[shooter.name]
+                if target.board.all_ships_sunk():
+                    return GameResult(shooter.name, shots, sink_turns, first_hits, hit_cells)
+
+            shooter, target = target, shooter
+
+
+def simulate_game(first=None, second=None, board_class=None, seed=None):
+    """Joue une partie sans interface et renvoie son GameResult."""
+    return HeadlessGame(first, second, board_class, seed).play()
+
+
+if __name__ == "__main__":
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    record_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    # Les statistiques sont cumulées au fil des parties: rien n'est gardé par partie.
+    stats = GameStats()
+    wins = 0
+    start = time.perf_counter()
+    if record_path:
+        from enregistrement import GameRecord, RecordWriter
+
+        with RecordWriter(record_path) as writer:
+            for seed in range(n_games):
+                game = HeadlessGame(seed=seed)
+                result = game.play()
+                writer.write(GameRecord.from_players(game.players, game.history, seed))
+                stats.add(result)
+                wins += result.winner == "Ordinateur 1"
+    else:
+        for _ in range(n_games):
+            result = simulate_game()
+            stats.add(result)
+            wins += result.winner == "Ordinateur 1"
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_games} parties en {elapsed:.2f} s ({n_games / elapsed:.0f} parties/s)")
+    print(f"Victoires du premier joueur: {wins / n_games:.1%}")
+    print(f"Tirs moyens du vainqueur: {stats.lengths.mean():.1f}")
+    for line in stats.summary():
+        print(line)
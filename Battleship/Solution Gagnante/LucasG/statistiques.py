@@ -0,0 +1,103 @@
+
+class Histogram:
+    """Histogramme d'entiers positifs: counts[v] compte les valeurs égales à v.
+
+    Sa taille ne dépend que de la plus grande valeur vue, jamais du nombre de
+    valeurs ajoutées.
+    """
+
+    def __init__(self):
+        self.counts = []
+        self.total = 0
+        self.total_sum = 0
+
+    def add(self, value, times=1):
+        if value >= len(self.counts):
+            self.counts.extend([0] * (value + 1 - len(self.counts)))
+        self.counts[value] += times
+        self.total += times
+        self.total_sum += value * times
+
+    def merge(self, other):
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for value, count in enumerate(other.counts):
+            self.counts[value] += count
+        self.total += other.total
+        self.total_sum += other.total_sum
+        return self
+
+    def mean(self):
+        return self.total_sum / self.total if self.total else 0.0
+
+    def percentile(self, q):
+        """Plus petite valeur v telle qu'au moins q des valeurs soient <= v."""
+        if not self.total:
+            return 0
+        needed = q * self.total
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if seen >= needed:
+                return value
+        return len(self.counts) - 1
+
+
+class GameStats:
+    """Statistiques de parties simulées, mises à jour une partie à la fois.
+
+    Les deux joueurs de chaque partie sont cumulés: longueur de la partie (tirs
+    du vainqueur), tir qui coule chaque navire, tir de la première touche et
+    nombre de touches par case. Aucun GameResult n'est gardé; les statistiques
+    partielles des processus se combinent avec merge.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.lengths = Histogram()
+        self.first_hits = Histogram()
+        self.sink_turns = {}
+        self.cell_hits = {}
+
+    def add(self, result):
+        self.games += 1
+        self.lengths.add(result.shots[result.winner])
+        for turn in result.first_hits.values():
+            if turn is not None:
+                self.first_hits.add(turn)
+        for ships in result.sink_turns.values():
+            for name, turn in ships.items():
+                histogram = self.sink_turns.get(name)
+                if histogram is None:
+                    histogram = self.sink_turns[name] = Histogram()
+                histogram.add(turn)
+        for positions in result.hit_cells.values():
+            for position in positions:
+                self.cell_hits[position] = self.cell_hits.get(position, 0) + 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.lengths.merge(other.lengths)
+        self.first_hits.merge(other.first_hits)
+        for name, histogram in other.sink_turns.items():
+            self.sink_turns.setdefault(name, Histogram()).merge(histogram)
+        for position, count in other.cell_hits.items():
+            self.cell_hits[position] = self.cell_hits.get(position, 0) + count
+        return self
+
+    def cell_frequency(self, position):
+        """Nombre moyen de touches par partie sur la case `position`."""
+        return self.cell_hits.get(position, 0) / self.games if self.games else 0.0
+
+    def summary(self):
+        """Lignes de texte résumant les statistiques."""
+        lines = [f"Longueur des parties: moyenne {self.lengths.mean():.1f}, "
+                 f"médiane {self.lengths.percentile(0.5)}, 90 % {self.lengths.percentile(0.9)}",
+                 f"Première touche: tir {self.first_hits.mean():.1f} en moyenne"]
+        for name, histogram in self.sink_turns.items():
+            lines.append(f"{name} coulé au tir {histogram.mean():.1f} en moyenne")
+        if self.cell_hits:
+            position = max(self.cell_hits, key=self.cell_hits.get)
+            lines.append(f"Case la plus touchée: {position} "
+                         f"({self.cell_frequency(position):.2f} touche par partie)")
+        return lines
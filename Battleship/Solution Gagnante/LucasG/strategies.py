@@ -0,0 +1,119 @@
+
+import random
+
+from placements import neighbour_masks
+
+
+class Strategy:
+    """Comportement d'un joueur: placement de sa flotte et choix de ses tirs.
+
+    `view` est la grille adverse telle que le joueur la voit (ses tirs et leurs
+    résultats). Player appelle place_fleet une fois, puis choose_shot et
+    observe_result à chaque tour. Les tirages passent par self.rng, le module
+    random tant que set_rng n'a pas donné un générateur propre à la partie.
+    """
+
+    rng = random
+
+    def set_rng(self, rng):
+        self.rng = rng
+
+    def place_fleet(self, board, ships):
+        """Place `ships` sur `board`; renvoie False si c'est impossible."""
+        return board.place_all_ships_randomly(ships)
+
+    def choose_shot(self, view):
+        raise NotImplementedError
+
+    def observe_result(self, position, hit, ship_sunk):
+        """Résultat du dernier tir: touché ou non, navire coulé ou None."""
+
+    def choose_shots(self, views):
+        """Un tir par grille de `views`, en un seul appel.
+
+        Par défaut, choose_shot est appelé pour chaque grille; une stratégie
+        vectorisée ou avec cache redéfinit cette méthode.
+        """
+        return [self.choose_shot(view) for view in views]
+
+
+class Observations:
+    """Ce que les tirs ont appris de la grille adverse, en masques (bit y * size + x).
+
+    shots, misses et hits: cases visées, à l'eau et touchées; open_hits: touches
+    qu'aucun navire coulé n'explique encore; empty: cases sûrement vides (tirs à
+    l'eau, navires coulés et leurs voisines, selon la règle de non-contact);
+    lengths: longueurs des navires encore à flot, dans l'ordre donné.
+    """
+
+    __slots__ = ("size", "lengths", "shots", "misses", "hits", "open_hits", "empty")
+
+    def __init__(self, size, lengths):
+        self.size = size
+        self.lengths = list(lengths)
+        self.shots = 0
+        self.misses = 0
+        self.hits = 0
+        self.open_hits = 0
+        self.empty = 0
+
+    def record(self, position, hit, ship_sunk):
+        """Note le résultat d'un tir; renvoie le masque du navire coulé, ou 0."""
+        x, y = position
+        bit = 1 << (y * self.size + x)
+        self.shots |= bit
+        if not hit:
+            self.misses |= bit
+            self.empty |= bit
+            return 0
+        self.hits |= bit
+        self.open_hits |= bit
+        if not ship_sunk:
+            return 0
+
+        if ship_sunk.size in self.lengths:
+            self.lengths.remove(ship_sunk.size)
+        neighbours = neighbour_masks(self.size)
+        sunk = 0
+        for sx, sy in ship_sunk.positions:
+            cell = sy * self.size + sx
+            sunk |= 1 << cell
+            self.empty |= neighbours[cell]
+        self.open_hits &= ~sunk
+        return sunk
+
+
+class RandomStrategy(Strategy):
+    """Tire sur une case jamais visée, au hasard."""
+
+    def choose_shot(self, view):
+        return view.random_free_cell()
+
+
+class HumanStrategy(Strategy):
+    """Le joueur humain place sa flotte et choisit ses tirs au clavier."""
+
+    def __init__(self, player):
+        self.player = player
+
+    def place_fleet(self, board, ships):
+        self.player._manual_ship_placement(ships)
+        return True
+
+    def choose_shot(self, view):
+        return self.player._get_human_shot()
+
+
+class BatchStrategy:
+    """Choisit en un appel un tir pour chacune des parties d'un lot.
+
+    `boards` expose, comme lot.BatchBoards, n_games, size et le plan shots;
+    choose_shots renvoie deux tableaux xs, ys. observe_results reçoit les
+    tableaux hit et sunk renvoyés par le tir.
+    """
+
+    def choose_shots(self, boards):
+        raise NotImplementedError
+
+    def observe_results(self, xs, ys, hit, sunk):
+        pass
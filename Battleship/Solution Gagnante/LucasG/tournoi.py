@@ -0,0 +1,146 @@
+
+import argparse
+import importlib
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bataille_navale import Player
+from simulation import simulate_game
+from statistiques import GameStats
+
+
+STRATEGIES = {
+    "aleatoire": "bataille_navale:Player",
+    "densite": "ia_densite:DensityPlayer",
+    "monte-carlo": "ia_monte_carlo:MonteCarloPlayer",
+    "exacte": "comptage_exact:ExactPlayer",
+}
+
+
+def load_strategy(name):
+    """Classe de joueur associée à un nom de STRATEGIES."""
+    module_name, class_name = STRATEGIES[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class TournamentResult:
+    """Statistiques cumulées d'un tournoi entre deux stratégies A et B.
+
+    stats cumule en plus les histogrammes de GameStats sur toutes les parties.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = {"A": 0, "B": 0}
+        self.shots_sum = {"A": 0, "B": 0}
+        self.shots_sq_sum = {"A": 0, "B": 0}
+        self.stats = GameStats()
+
+    def add(self, result):
+        self.games += 1
+        self.stats.add(result)
+        shots = result.shots[result.winner]
+        self.wins[result.winner] += 1
+        self.shots_sum[result.winner] += shots
+        self.shots_sq_sum[result.winner] += shots * shots
+
+    def merge(self, other):
+        self.games += other.games
+        for side in ("A", "B"):
+            self.wins[side] += other.wins[side]
+            self.shots_sum[side] += other.shots_sum[side]
+            self.shots_sq_sum[side] += other.shots_sq_sum[side]
+        self.stats.merge(other.stats)
+        return self
+
+    def win_rate(self, side="A"):
+        """Taux de victoire et demi-largeur de son intervalle de confiance à 95 %."""
+        if not self.games:
+            return 0.0, 0.0
+        rate = self.wins[side] / self.games
+        return rate, 1.96 * math.sqrt(rate * (1 - rate) / self.games)
+
+    def mean_shots(self, side="A"):
+        """Nombre moyen de tirs dans les parties gagnées et demi-largeur à 95 %."""
+        wins = self.wins[side]
+        if not wins:
+            return 0.0, 0.0
+        mean = self.shots_sum[side] / wins
+        variance = max(self.shots_sq_sum[side] / wins - mean * mean, 0.0)
+        return mean, 1.96 * math.sqrt(variance / wins)
+
+
+def game_seed(base_seed, index):
+    """Graine de la partie `index`, indépendante des autres parties.
+
+    Elle ne dépend ni du découpage en lots ni du nombre de processus: la
+    partie se rejoue avec simulate_game(..., seed=game_seed(base_seed, index)).
+    """
+    return random.Random(f"{base_seed}:{index}").getrandbits(64)
+
+
+def _play_chunk(first_class, second_class, start, count, seed):
+    partial = TournamentResult()
+    for game_index in range(start, start + count):
+        a = first_class("A", is_computer=True)
+        b = second_class("B", is_computer=True)
+        # On alterne le joueur qui commence pour ne pas avantager A.
+        if game_index % 2:
+            a, b = b, a
+        partial.add(simulate_game(a, b, seed=game_seed(seed, game_index)))
+    return partial
+
+
+def run_tournament(n_games, first_class=Player, second_class=Player,
+                   workers=None, chunk_size=1000, seed=None):
+    """Répartit n_games parties entre les processus et fusionne leurs résultats."""
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count() or 1
+
+    chunks = [(start, min(chunk_size, n_games - start))
+              for start in range(0, n_games, chunk_size)]
+
+    result = TournamentResult()
+    if workers == 1:
+        for start, count in chunks:
+            result.merge(_play_chunk(first_class, second_class, start, count, seed))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_chunk, first_class, second_class, start, count, seed)
+                   for start, count in chunks]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tournoi entre deux stratégies de tir.")
+    parser.add_argument("games", type=int, nargs="?", default=10000)
+    parser.add_argument("-a", choices=STRATEGIES, default="aleatoire")
+    parser.add_argument("-b", choices=STRATEGIES, default="aleatoire")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stats", action="store_true", help="affiche les histogrammes des parties")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_tournament(args.games, load_strategy(args.a), load_strategy(args.b),
+                            workers=args.workers,
+                            chunk_size=args.chunk_size, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{result.games} parties en {elapsed:.2f} s ({result.games / elapsed:.0f} parties/s)")
+    for side in ("A", "B"):
+        rate, rate_margin = result.win_rate(side)
+        shots, shots_margin = result.mean_shots(side)
+        print(f"{side}: {rate:.1%} ± {rate_margin:.1%} de victoires, "
+              f"{shots:.2f} ± {shots_margin:.2f} tirs par victoire")
+    if args.stats:
+        for line in result.stats.summary():
+            print(line)